@@ -2,13 +2,21 @@ import streamlit as st
 import pandas as pd
 import plotly.express as px
 import os
+import tempfile
+import time
 
 # Backend imports
-from backend.resume_parser import extract_text, normalize_text, extract_skills_from_resume, extract_candidate_info
-from backend.jd_parser import parse_jd
-from backend.matcher import final_score, generate_feedback
-from backend.db import init_db, save_evaluation, fetch_all
-from backend.report_generator import generate_report
+from backend.matcher import generate_feedback
+from backend.pipeline import load_jd, load_resumes, score_resumes
+from backend.jobs import RankingJob
+from backend.db import (
+    content_hash, init_db, save_evaluation, save_evaluations_bulk,
+    query_evaluations, count_evaluations, list_jd_files
+)
+from backend.report_generator import render_report, generate_reports_async
+from backend.result_store import EXPORT_COLUMNS, export_row, write_csv, write_excel
+from backend.vector_index import search_pool, sync_pool_index
+from backend import instrumentation
 
 # --- Page Config ---
 st.set_page_config(page_title="Resume Relevance Checker", layout="wide")
@@ -17,9 +25,38 @@ st.write("✅ App started running...")
 # Initialize DB
 init_db()
 
+
+@st.cache_data(ttl=3600, max_entries=32, show_spinner="Evaluating...")
+def evaluate_uploads(resume_hash, jd_hash, _resume_name, _resume_bytes, _jd_name, _jd_bytes):
+    """
+    Extract, parse and score one resume/JD pair. Cached by (resume_hash, jd_hash)
+    across reruns and sessions; Streamlit does not hash the underscore arguments.
+    Holds at most 32 pairs, each for at most an hour.
+    """
+    resume_doc = load_resumes([(_resume_name, _resume_bytes)])[0]
+    if resume_doc["error"]:
+        return {"error": resume_doc["error"]}
+    jd_doc = load_jd(_jd_name, _jd_bytes)
+    result = score_resumes(jd_doc, [resume_doc])[0]
+    return {
+        "error": None,
+        "resume_text": resume_doc["text"],
+        "jd_text": jd_doc["text"],
+        "jd_parsed": jd_doc["parsed"],
+        "resume_skills": resume_doc["skills"],
+        "candidate_info": resume_doc["candidate_info"],
+        "result": result,
+        "feedback": generate_feedback(jd_doc["parsed"], result),
+    }
+
+
+# Bulk Ranking shows this many rows; exports always contain every row
+BULK_DISPLAY_ROWS = 200
+
+
 # --- Sidebar Navigation ---
 st.sidebar.title("📍 Navigation")
-page = st.sidebar.radio("Go to", ["🏠 Home", "📊 Evaluate", "📑 Bulk Ranking", "📜 History"])
+page = st.sidebar.radio("Go to", ["🏠 Home", "📊 Evaluate", "📑 Bulk Ranking", "🔎 Talent Pool", "📜 History", "⏱ Diagnostics"])
 
 # --- Main Title ---
 st.title("⚡ Automated Resume Relevance Checker")
@@ -51,35 +88,26 @@ elif page == "📊 Evaluate":
     jd_file = st.file_uploader("Upload Job Description (PDF)", type=["pdf"])
 
     if resume_file and jd_file:
-        # Save temp files
-        resume_path = "temp_resume.pdf"
-        jd_path = "temp_jd.pdf"
-
-        with open(resume_path, "wb") as f:
-            f.write(resume_file.read())
-        with open(jd_path, "wb") as f:
-            f.write(jd_file.read())
+        # Keyed by content hash: reruns from button clicks hit the cache
+        evaluation = evaluate_uploads(
+            content_hash(resume_file.getvalue()), content_hash(jd_file.getvalue()),
+            resume_file.name, resume_file.getvalue(), jd_file.name, jd_file.getvalue()
+        )
+        if evaluation["error"]:
+            st.error(f"Could not read {resume_file.name}: {evaluation['error']}")
+            st.stop()
 
-        # Extract text
-        resume_text = normalize_text(extract_text(resume_path))
-        jd_text = normalize_text(extract_text(jd_path))
+        resume_text = evaluation["resume_text"]
+        jd_text = evaluation["jd_text"]
+        jd_parsed = evaluation["jd_parsed"]
+        resume_skills = evaluation["resume_skills"]
+        result = evaluation["result"]
+        feedback = evaluation["feedback"]
 
         # Candidate info
-        candidate_info = extract_candidate_info(resume_text)
+        candidate_info = evaluation["candidate_info"]
         candidate_name = candidate_info.get("name") or "Candidate"
 
-        # Parse JD
-        jd_parsed = parse_jd(jd_text, file_path=jd_path)
-
-        # Extract resume skills
-        resume_skills = extract_skills_from_resume(resume_text)
-
-        # Final scoring
-        result = final_score(resume_skills, jd_parsed, resume_text, jd_text)
-
-        # Feedback
-        feedback = generate_feedback(jd_parsed, result)
-
         # --- Display Results ---
         st.subheader(f"📊 Evaluation Results for {candidate_name}")
 
@@ -128,31 +156,74 @@ elif page == "📊 Evaluate":
             )
             st.success("Evaluation saved to database!")
 
-        # PDF Report
+        # PDF Report (rendered in memory, nothing written to disk)
         if st.button("📄 Generate PDF Report"):
-            output_path = f"{candidate_name}_report.pdf"
-            generate_report(
+            pdf = render_report(
                 candidate_name=candidate_name,
                 resume_file=resume_file.name,
                 jd_file=jd_file.name,
                 result=result,
-                feedback=feedback,
-                output_path=output_path
+                feedback=feedback
+            )
+            st.download_button(
+                "⬇️ Download Candidate Report", pdf, f"{candidate_name}_report.pdf", mime="application/pdf"
             )
-            with open(output_path, "rb") as f:
-                st.download_button("⬇️ Download Candidate Report", f, output_path, mime="application/pdf")
 
 # ================= HISTORY =================
 elif page == "📜 History":
     st.subheader("📜 Previous Evaluations")
-    rows = fetch_all()
+
+    column_labels = {
+        "id": "ID", "timestamp": "Timestamp", "candidate_name": "Candidate", "resume_file": "Resume",
+        "jd_file": "JD", "final_score": "Final Score", "hard_score": "Hard Score", "soft_score": "Soft Score",
+        "verdict": "Verdict", "missing_skills": "Missing Skills", "feedback": "Feedback"
+    }
+
+    # Filters
+    fcol1, fcol2, fcol3 = st.columns(3)
+    jd_choice = fcol1.selectbox("Job Description", ["All"] + list_jd_files())
+    verdicts = fcol2.multiselect("Verdict", ["High", "Medium", "Low"])
+    score_range = fcol3.slider("Final Score", 0.0, 100.0, (0.0, 100.0))
+    dcol1, dcol2, dcol3 = st.columns(3)
+    date_range = dcol1.date_input("Date range", value=())
+    page_size = dcol2.selectbox("Rows per page", [25, 50, 100, 250], index=1)
+    columns = dcol3.multiselect(
+        "Columns", list(column_labels),
+        default=["timestamp", "candidate_name", "resume_file", "jd_file", "final_score", "verdict"],
+        format_func=column_labels.get
+    )
+
+    filters = {
+        "jd_file": None if jd_choice == "All" else jd_choice,
+        "verdicts": verdicts or None,
+        "min_score": score_range[0] if score_range[0] > 0 else None,
+        "max_score": score_range[1] if score_range[1] < 100 else None,
+        "since": date_range[0].isoformat() if len(date_range) > 0 else None,
+        "until": date_range[1].isoformat() + "T23:59:59.999999" if len(date_range) > 1 else None,
+    }
+
+    # Keyset pagination: keep the cursor of every page visited; reset when filters change
+    filter_key = repr((filters, page_size))
+    if st.session_state.get("history_filter_key") != filter_key:
+        st.session_state.history_filter_key = filter_key
+        st.session_state.history_cursors = [None]
+    cursors = st.session_state.history_cursors
+
+    rows, next_cursor = query_evaluations(columns=columns or None, after=cursors[-1], limit=page_size, **filters)
+    total = count_evaluations(**filters)
+
     if rows:
-        df = pd.DataFrame(rows, columns=[
-            "ID", "Timestamp", "Candidate", "Resume", "JD",
-            "Final Score", "Hard Score", "Soft Score", "Verdict",
-            "Missing Skills", "Feedback"
-        ])
-        st.dataframe(df)
+        df = pd.DataFrame(rows, columns=[column_labels[c] for c in (columns or column_labels)])
+        st.caption(f"Page {len(cursors)} · {total} matching evaluations")
+        st.dataframe(df, use_container_width=True)
+
+        pcol1, pcol2 = st.columns(2)
+        if pcol1.button("⬅️ Previous", disabled=len(cursors) == 1):
+            cursors.pop()
+            st.rerun()
+        if pcol2.button("Next ➡️", disabled=next_cursor is None):
+            cursors.append(next_cursor)
+            st.rerun()
     else:
         st.info("No evaluations found yet. Run one from 📊 Evaluate.")
 
@@ -166,46 +237,205 @@ elif page == "📑 Bulk Ranking":
     )
 
     if jd_file and resume_files:
-        # Save JD
-        jd_path = "temp_bulk_jd.pdf"
-        with open(jd_path, "wb") as f:
-            f.write(jd_file.read())
-
-        jd_text = normalize_text(extract_text(jd_path))
-        jd_parsed = parse_jd(jd_text, file_path=jd_path)
-
+        # Ranking runs as a background job kept in the session, so reruns
+        # (widget clicks, polling) never recompute finished work. Keyed by
+        # content hash: a changed file re-uploaded under the same name starts a new job
+        job_key = (content_hash(jd_file.getvalue()), tuple((f.name, content_hash(f.getvalue())) for f in resume_files))
+        job = st.session_state.get("bulk_job")
+        if job is None or job.key != job_key:
+            if job is not None:
+                job.close()
+            jd_doc = load_jd(jd_file.name, jd_file.getvalue())
+            # A generator: the job copies each file's bytes only when it reaches its chunk
+            job = RankingJob(
+                job_key, jd_doc, ((f.name, f.getvalue()) for f in resume_files), total=len(resume_files),
+                profile=st.session_state.get("profile_next_run", False)
+            ).start()
+            st.session_state.profile_next_run = False
+            st.session_state.bulk_job = job
+            st.session_state.pop("report_packet", None)
+            for path in (st.session_state.pop("ranking_exports", None) or {}).values():
+                os.remove(path)
+        jd_parsed = job.jd_doc["parsed"]
+
+        job.poll()
+        for file_name, error in job.errors:
+            st.warning(f"Skipped {file_name}: {error}")
+
+        if job.running:
+            eta = job.eta()
+            st.progress(
+                job.processed / job.total,
+                text=f"Ranked {job.processed}/{job.total} resumes"
+                     + (f" · about {eta:.0f}s left" if eta is not None else "")
+            )
+            if st.button("⏹ Stop"):
+                job.cancel()
+        elif job.status == "failed":
+            st.error(f"Ranking failed: {job.error}")
+        elif job.status == "cancelled":
+            st.info(f"Ranking stopped after {job.processed}/{job.total} resumes.")
+        else:
+            st.success("✅ Ranking Complete!")
+
+        # Only the best rows are shown; the full ranking stays in job.store on disk
         results = []
-        for resume_file in resume_files:
-            # Save each resume temporarily
-            resume_path = f"temp_{resume_file.name}"
-            with open(resume_path, "wb") as f:
-                f.write(resume_file.read())
-
-            # Extract text & skills
-            resume_text = normalize_text(extract_text(resume_path))
-            resume_skills = extract_skills_from_resume(resume_text)
-            candidate_info = extract_candidate_info(resume_text)
-            candidate_name = candidate_info.get("name") or resume_file.name
-
-            # Score
-            result = final_score(resume_skills, jd_parsed, resume_text, jd_text)
-
-            results.append({
-                "Candidate": candidate_name,
-                "Final Score": result["final_score"],
-                "Verdict": result["verdict"],
-                "Hard Score": result["hard_score"],
-                "Soft Score": result["soft_score"],
-                "Matched Skills": ", ".join(resume_skills),
-                "Missing Skills": ", ".join(result["missing_must"] + result["missing_good"])
-            })
-
-        # Convert to DataFrame & sort
-        df = pd.DataFrame(results).sort_values(by="Final Score", ascending=False)
-
-        st.success("✅ Ranking Complete!")
-        st.dataframe(df, use_container_width=True)
+        for row in job.store.top(BULK_DISPLAY_ROWS):
+            results.append({c: v for c, v in zip(EXPORT_COLUMNS, export_row(row)) if c != "File"})
+
+        if results:
+            # Convert to DataFrame & sort (partial while the job is running)
+            df = pd.DataFrame(results)
+            if job.ranked > len(results):
+                st.caption(f"Showing the top {len(results)} of {job.ranked} ranked resumes")
+            st.dataframe(df, use_container_width=True)
+
+        if job.running:
+            time.sleep(1)
+            st.rerun()
+        elif results:
+            # Exports are streamed from the store to temp files in chunks, once per run
+            exports = st.session_state.get("ranking_exports")
+            if exports is None:
+                exports = st.session_state.ranking_exports = {}
+                with tempfile.NamedTemporaryFile(suffix=".csv", delete=False) as f:
+                    write_csv(job.store.iter_rows(), f)
+                exports["csv"] = f.name
+            with open(exports["csv"], "rb") as f:
+                st.download_button("⬇️ Download Results as CSV", f, "ranking_results.csv", "text/csv")
+
+            if "xlsx" not in exports and st.button("📗 Prepare Excel Export"):
+                try:
+                    with tempfile.NamedTemporaryFile(suffix=".xlsx", delete=False) as f:
+                        write_excel(job.store.iter_rows(), f)
+                    exports["xlsx"] = f.name
+                except ImportError:
+                    st.warning("Excel export needs openpyxl (pip install openpyxl).")
+            if "xlsx" in exports:
+                with open(exports["xlsx"], "rb") as f:
+                    st.download_button(
+                        "⬇️ Download Results as Excel", f, "ranking_results.xlsx",
+                        "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+                    )
+
+            # Save the whole ranking, one transaction per chunk of rows
+            if st.button("💾 Save Ranking to Database"):
+                saved, chunk = 0, []
+                for row in job.store.iter_rows():
+                    chunk.append({
+                        "candidate_name": row["candidate_name"],
+                        "resume_file": row["file_name"],
+                        "jd_file": jd_file.name,
+                        "result": row["result"],
+                        "feedback": generate_feedback(jd_parsed, row["result"]),
+                    })
+                    if len(chunk) == 500:
+                        saved += save_evaluations_bulk(chunk)
+                        chunk = []
+                saved += save_evaluations_bulk(chunk)
+                st.success(f"Saved {saved} evaluations to database!")
+
+            # Report packet for the whole run, built in worker processes off the UI thread
+            rcol1, rcol2 = st.columns(2)
+            packet_format = rcol1.radio("Report packet", ["zip", "pdf"], horizontal=True,
+                                        format_func={"zip": "ZIP of PDFs", "pdf": "Combined PDF"}.get)
+            if rcol2.button("📦 Build Report Packet"):
+                ranked_rows = job.store.iter_rows()
+                st.session_state.report_packet = (packet_format, generate_reports_async([
+                    {
+                        "candidate_name": row["candidate_name"],
+                        "resume_file": row["file_name"],
+                        "jd_file": jd_file.name,
+                        "result": row["result"],
+                        "feedback": generate_feedback(jd_parsed, row["result"]),
+                    }
+                    for row in ranked_rows
+                ], fmt=packet_format))
+
+            packet = st.session_state.get("report_packet")
+            if packet:
+                fmt, future = packet
+                if future.done():
+                    mime = "application/zip" if fmt == "zip" else "application/pdf"
+                    st.download_button("⬇️ Download Report Packet", future.result(), f"ranking_reports.{fmt}", mime)
+                else:
+                    st.info("Building report packet...")
+                    time.sleep(1)
+                    st.rerun()
+
+# ================= TALENT POOL =================
+elif page == "🔎 Talent Pool":
+    st.subheader("🔎 Search Talent Pool by JD")
+    st.caption("Searches every resume already evaluated, without re-uploading them.")
+
+    pool_size = len(sync_pool_index())
+    st.write(f"Resumes in pool: **{pool_size}**")
+
+    jd_file = st.file_uploader("Upload Job Description (PDF)", type=["pdf"], key="pool_jd")
+    col1, col2 = st.columns(2)
+    top_k = col1.slider("Shortlist size", 5, 200, 20)
+    rescore = col2.checkbox("Re-score shortlist with full matching", value=True)
+
+    if jd_file and pool_size:
+        jd_doc = load_jd(jd_file.name, jd_file.getvalue())
+        matches = search_pool(jd_doc, k=top_k, rescore=rescore)
+
+        rows = []
+        for m in matches:
+            row = {
+                "Candidate": m["candidate_info"].get("name") or m["file_name"],
+                "Resume": m["file_name"],
+                "Similarity": m["similarity"],
+            }
+            if m["result"]:
+                row.update({
+                    "Final Score": m["result"]["final_score"],
+                    "Verdict": m["result"]["verdict"],
+                    "Hard Score": m["result"]["hard_score"],
+                    "Missing Skills": ", ".join(m["result"]["missing_must"] + m["result"]["missing_good"]),
+                })
+            rows.append(row)
+        st.dataframe(pd.DataFrame(rows), use_container_width=True)
+    elif not pool_size:
+        st.info("The pool is empty. Evaluate or bulk-rank some resumes first.")
+
+# ================= DIAGNOSTICS =================
+elif page == "⏱ Diagnostics":
+    st.subheader("⏱ Pipeline Diagnostics")
+
+    enabled = st.toggle("Record per-stage timings", value=instrumentation.ENABLED)
+    if enabled != instrumentation.ENABLED:
+        instrumentation.enable() if enabled else instrumentation.disable()
+    # Plain session key (not a widget key) so the flag survives switching pages
+    st.session_state.profile_next_run = st.checkbox(
+        "Profile the next bulk ranking run (cProfile)", value=st.session_state.get("profile_next_run", False)
+    )
 
-        # Download option
-        csv = df.to_csv(index=False).encode("utf-8")
-        st.download_button("⬇️ Download Results as CSV", csv, "ranking_results.csv", "text/csv")
+    metrics = instrumentation.snapshot()
+    if metrics["stages"]:
+        stage_df = pd.DataFrame([
+            {"Stage": name, "Calls": m["count"], "Total (s)": m["total_s"], "Mean (ms)": m["mean_ms"],
+             "p50 (ms)": m["p50_ms"], "p95 (ms)": m["p95_ms"], "Max (ms)": m["max_ms"], "Mean size": m["mean_size"]}
+            for name, m in metrics["stages"].items()
+        ]).sort_values(by="Total (s)", ascending=False)
+        st.dataframe(stage_df, use_container_width=True)
+    else:
+        st.info("No timings recorded yet. Enable recording and run an evaluation or bulk ranking.")
+
+    if metrics["caches"]:
+        st.markdown("**Cache hit rates**")
+        st.dataframe(pd.DataFrame([
+            {"Cache": name, "Hits": c["hits"], "Misses": c["misses"], "Hit rate": c["hit_rate"]}
+            for name, c in metrics["caches"].items()
+        ]), use_container_width=True)
+
+    dcol1, dcol2, dcol3 = st.columns(3)
+    dcol1.download_button("⬇️ JSON", instrumentation.to_json(), "metrics.json", "application/json")
+    dcol2.download_button("⬇️ Prometheus", instrumentation.to_prometheus(), "metrics.prom", "text/plain")
+    if dcol3.button("🗑 Reset"):
+        instrumentation.reset()
+        st.rerun()
+
+    for prof in reversed(instrumentation.profiles()):
+        with st.expander(f"Profile: {prof['name']}"):
+            st.text(prof["stats"])
@@ -2,43 +2,166 @@
 import sqlite3
 import os
 import json
+import hashlib
+import threading
+from contextlib import contextmanager
 from datetime import datetime
 
+from backend.instrumentation import timed, size_of
+
 DB_PATH = os.path.join(os.path.dirname(__file__), "..", "results.db")
 
+# Applied to every new connection. WAL lets readers (e.g. History page) run
+# while another session writes; busy_timeout makes writers wait instead of failing.
+PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA busy_timeout=10000",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-16000",
+)
+
+# One connection per thread (Streamlit runs each session in its own thread)
+_local = threading.local()
+_init_lock = threading.Lock()
+_initialized_path = None
+
+
+def get_connection() -> sqlite3.Connection:
+    """Return this thread's connection to DB_PATH, opening it on first use."""
+    conn = getattr(_local, "conn", None)
+    if conn is None or getattr(_local, "path", None) != DB_PATH:
+        if conn is not None:
+            conn.close()
+        conn = sqlite3.connect(DB_PATH, timeout=30)
+        for pragma in PRAGMAS:
+            conn.execute(pragma)
+        _local.conn, _local.path = conn, DB_PATH
+    return conn
+
+
+@contextmanager
+def transaction():
+    """Run the enclosed statements in one transaction on this thread's connection."""
+    conn = get_connection()
+    try:
+        yield conn.cursor()
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+
+
+def close_connection():
+    """Close this thread's connection (it is reopened on next use)."""
+    conn = getattr(_local, "conn", None)
+    if conn is not None:
+        conn.close()
+        _local.conn = None
+
+
+# Schema migrations, applied in order. PRAGMA user_version records the last
+# one applied, so each runs exactly once per database file.
+MIGRATIONS = [
+    (1, [
+        '''
+        CREATE TABLE IF NOT EXISTS evaluations (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            timestamp TEXT,
+            candidate_name TEXT,
+            resume_file TEXT,
+            jd_file TEXT,
+            final_score REAL,
+            hard_score REAL,
+            soft_score REAL,
+            verdict TEXT,
+            missing_skills TEXT,
+            feedback TEXT
+        )
+        ''',
+    ]),
+    (2, [
+        "CREATE INDEX IF NOT EXISTS idx_evaluations_timestamp ON evaluations(timestamp, id)",
+        "CREATE INDEX IF NOT EXISTS idx_evaluations_jd_file ON evaluations(jd_file, timestamp)",
+        "CREATE INDEX IF NOT EXISTS idx_evaluations_verdict ON evaluations(verdict, timestamp)",
+        "CREATE INDEX IF NOT EXISTS idx_evaluations_final_score ON evaluations(final_score)",
+    ]),
+    (3, [
+        '''
+        CREATE TABLE IF NOT EXISTS documents (
+            content_hash TEXT PRIMARY KEY,
+            kind TEXT,
+            file_name TEXT,
+            text TEXT,
+            parsed TEXT,
+            candidate_info TEXT,
+            created_at TEXT
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS score_memo (
+            resume_hash TEXT,
+            jd_hash TEXT,
+            config_version TEXT,
+            result TEXT,
+            created_at TEXT,
+            PRIMARY KEY (resume_hash, jd_hash, config_version)
+        )
+        ''',
+        "CREATE INDEX IF NOT EXISTS idx_score_memo_jd ON score_memo(jd_hash, config_version)",
+    ]),
+    (4, [
+        '''
+        CREATE TABLE IF NOT EXISTS watched_files (
+            path TEXT PRIMARY KEY,
+            size INTEGER,
+            mtime REAL,
+            content_hash TEXT,
+            status TEXT,
+            error TEXT,
+            updated_at TEXT
+        )
+        ''',
+        "CREATE INDEX IF NOT EXISTS idx_watched_files_hash ON watched_files(content_hash)",
+        '''
+        CREATE TABLE IF NOT EXISTS active_jds (
+            jd_hash TEXT PRIMARY KEY,
+            file_name TEXT,
+            activated_at TEXT
+        )
+        ''',
+    ]),
+]
+
+
+def migrate():
+    """Apply any migrations newer than the database's user_version."""
+    conn = get_connection()
+    current = conn.execute("PRAGMA user_version").fetchone()[0]
+    for version, statements in MIGRATIONS:
+        if version <= current:
+            continue
+        with transaction() as cur:
+            for statement in statements:
+                cur.execute(statement)
+            cur.execute(f"PRAGMA user_version = {int(version)}")
+
+
 def init_db():
-    """Initialize database and create table if not exists."""
-    conn = sqlite3.connect(DB_PATH)
-    cur = conn.cursor()
-    cur.execute('''
-    CREATE TABLE IF NOT EXISTS evaluations (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        timestamp TEXT,
-        candidate_name TEXT,
-        resume_file TEXT,
-        jd_file TEXT,
-        final_score REAL,
-        hard_score REAL,
-        soft_score REAL,
-        verdict TEXT,
-        missing_skills TEXT,
-        feedback TEXT
-    )
-    ''')
-    conn.commit()
-    conn.close()
+    """Initialize database and bring its schema up to date. Runs once per process."""
+    global _initialized_path
+    if _initialized_path == DB_PATH:
+        return
+    with _init_lock:
+        if _initialized_path == DB_PATH:
+            return
+        migrate()
+        _initialized_path = DB_PATH
 
-def save_evaluation(candidate_name, resume_file, jd_file, result: dict, feedback: str):
-    """Save evaluation result to DB."""
-    conn = sqlite3.connect(DB_PATH)
-    cur = conn.cursor()
-    cur.execute('''
-    INSERT INTO evaluations (
-        timestamp, candidate_name, resume_file, jd_file,
-        final_score, hard_score, soft_score, verdict, missing_skills, feedback
-    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-    ''', (
-        datetime.utcnow().isoformat(),
+
+def _evaluation_row(candidate_name, resume_file, jd_file, result: dict, feedback: str, timestamp: str) -> tuple:
+    return (
+        timestamp,
         candidate_name,
         resume_file,
         jd_file,
@@ -48,15 +171,323 @@ def save_evaluation(candidate_name, resume_file, jd_file, result: dict, feedback
         result["verdict"],
         json.dumps(result.get("missing_must", []) + result.get("missing_good", [])),
         feedback
-    ))
-    conn.commit()
-    conn.close()
+    )
+
+
+@timed("db.save_evaluations_bulk", size=size_of(0, "evaluations"))
+def save_evaluations_bulk(evaluations: list) -> int:
+    """
+    Save many evaluation results in a single transaction.
+    :param evaluations: dicts with candidate_name, resume_file, jd_file, result, feedback
+    :return: number of rows inserted
+    """
+    timestamp = datetime.utcnow().isoformat()
+    rows = [
+        _evaluation_row(
+            e["candidate_name"], e["resume_file"], e["jd_file"], e["result"], e.get("feedback", ""), timestamp
+        )
+        for e in evaluations
+    ]
+    if not rows:
+        return 0
+    init_db()
+    with transaction() as cur:
+        cur.executemany('''
+        INSERT INTO evaluations (
+            timestamp, candidate_name, resume_file, jd_file,
+            final_score, hard_score, soft_score, verdict, missing_skills, feedback
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', rows)
+    return len(rows)
+
+
+def save_evaluation(candidate_name, resume_file, jd_file, result: dict, feedback: str):
+    """Save evaluation result to DB."""
+    save_evaluations_bulk([{
+        "candidate_name": candidate_name,
+        "resume_file": resume_file,
+        "jd_file": jd_file,
+        "result": result,
+        "feedback": feedback,
+    }])
+
 
 def fetch_all():
     """Fetch all evaluations from DB."""
-    conn = sqlite3.connect(DB_PATH)
-    cur = conn.cursor()
-    cur.execute("SELECT * FROM evaluations ORDER BY timestamp DESC")
-    rows = cur.fetchall()
-    conn.close()
-    return rows
+    init_db()
+    cur = get_connection().execute("SELECT * FROM evaluations ORDER BY timestamp DESC")
+    return cur.fetchall()
+
+
+EVALUATION_COLUMNS = (
+    "id", "timestamp", "candidate_name", "resume_file", "jd_file",
+    "final_score", "hard_score", "soft_score", "verdict", "missing_skills", "feedback"
+)
+
+
+@timed("db.query_evaluations")
+def query_evaluations(columns=None, jd_file=None, verdicts=None, min_score=None, max_score=None,
+                      since=None, until=None, after=None, limit=50):
+    """
+    Fetch one page of evaluations, newest first.
+    :param columns: subset of EVALUATION_COLUMNS to return (default: all)
+    :param jd_file: only rows for this JD file name
+    :param verdicts: only rows whose verdict is in this list
+    :param min_score / max_score: final_score range (inclusive)
+    :param since / until: ISO timestamp range (inclusive)
+    :param after: cursor returned by the previous page, None for the first page
+    :param limit: page size
+    :return: (rows, next_cursor); next_cursor is None on the last page
+    """
+    columns = list(columns or EVALUATION_COLUMNS)
+    unknown = set(columns) - set(EVALUATION_COLUMNS)
+    if unknown:
+        raise ValueError(f"Unknown columns: {sorted(unknown)}")
+
+    where, params = _evaluation_filters(jd_file, verdicts, min_score, max_score, since, until)
+    if after is not None:
+        # Keyset pagination: continue strictly after the last (timestamp, id) seen
+        where.append("(timestamp < ? OR (timestamp = ? AND id < ?))")
+        params.extend([after[0], after[0], after[1]])
+
+    # timestamp/id are always selected (last two columns) to build the cursor
+    sql = f"SELECT {', '.join(columns)}, timestamp, id FROM evaluations"
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    sql += " ORDER BY timestamp DESC, id DESC LIMIT ?"
+    params.append(int(limit) + 1)
+
+    init_db()
+    rows = get_connection().execute(sql, params).fetchall()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = (rows[-1][-2], rows[-1][-1])
+    return [row[:-2] for row in rows], next_cursor
+
+
+def count_evaluations(jd_file=None, verdicts=None, min_score=None, max_score=None, since=None, until=None) -> int:
+    """Number of evaluations matching the same filters as query_evaluations."""
+    where, params = _evaluation_filters(jd_file, verdicts, min_score, max_score, since, until)
+    sql = "SELECT COUNT(*) FROM evaluations"
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    init_db()
+    return get_connection().execute(sql, params).fetchone()[0]
+
+
+def list_jd_files() -> list:
+    """Distinct JD file names that have evaluations (served from the jd_file index)."""
+    init_db()
+    rows = get_connection().execute("SELECT DISTINCT jd_file FROM evaluations ORDER BY jd_file").fetchall()
+    return [r[0] for r in rows if r[0]]
+
+
+def _evaluation_filters(jd_file, verdicts, min_score, max_score, since, until) -> tuple:
+    where, params = [], []
+    if jd_file:
+        where.append("jd_file = ?")
+        params.append(jd_file)
+    if verdicts:
+        where.append(f"verdict IN ({','.join('?' * len(verdicts))})")
+        params.extend(verdicts)
+    if min_score is not None:
+        where.append("final_score >= ?")
+        params.append(min_score)
+    if max_score is not None:
+        where.append("final_score <= ?")
+        params.append(max_score)
+    if since:
+        where.append("timestamp >= ?")
+        params.append(since)
+    if until:
+        where.append("timestamp <= ?")
+        params.append(until)
+    return where, params
+
+
+def content_hash(data: bytes) -> str:
+    """Content address of an uploaded file (sha256 of its bytes)."""
+    return hashlib.sha256(data).hexdigest()
+
+
+def _chunks(items: list, size: int = 500):
+    # Keep IN (...) lists below SQLite's host-parameter limit
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+@timed("db.save_documents", size=size_of(0, "documents"))
+def save_documents(documents: list):
+    """
+    Store extracted documents, one row per content hash (existing rows are replaced).
+    :param documents: dicts with hash, kind ("resume"/"jd"), file_name, text and
+                      optional parsed (JD fields) / candidate_info
+    """
+    if not documents:
+        return
+    now = datetime.utcnow().isoformat()
+    init_db()
+    with transaction() as cur:
+        cur.executemany('''
+        INSERT OR REPLACE INTO documents (content_hash, kind, file_name, text, parsed, candidate_info, created_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+        ''', [
+            (
+                d["hash"], d["kind"], d["file_name"], d["text"],
+                json.dumps(d.get("parsed")), json.dumps(d.get("candidate_info")), now
+            )
+            for d in documents
+        ])
+
+
+@timed("db.get_documents", size=size_of(0, "hashes"))
+def get_documents(hashes: list) -> dict:
+    """Stored documents for the given content hashes, as {hash: document dict}."""
+    found = {}
+    init_db()
+    conn = get_connection()
+    for chunk in _chunks(list(dict.fromkeys(hashes))):
+        rows = conn.execute(
+            f"SELECT content_hash, kind, file_name, text, parsed, candidate_info FROM documents "
+            f"WHERE content_hash IN ({','.join('?' * len(chunk))})", chunk
+        ).fetchall()
+        for h, kind, file_name, text, parsed, candidate_info in rows:
+            found[h] = {
+                "hash": h, "kind": kind, "file_name": file_name, "text": text,
+                "parsed": json.loads(parsed) if parsed else None,
+                "candidate_info": json.loads(candidate_info) if candidate_info else None,
+            }
+    return found
+
+
+def list_document_hashes(kind: str = None) -> list:
+    """Content hashes of stored documents, optionally only one kind ("resume"/"jd")."""
+    init_db()
+    if kind:
+        rows = get_connection().execute("SELECT content_hash FROM documents WHERE kind = ?", (kind,)).fetchall()
+    else:
+        rows = get_connection().execute("SELECT content_hash FROM documents").fetchall()
+    return [r[0] for r in rows]
+
+
+@timed("db.save_scores", size=size_of(2, "scores"))
+def save_scores(jd_hash: str, config_version: str, scores: list):
+    """
+    Memoize scoring results against one JD.
+    :param scores: list of (resume_hash, result dict) pairs
+    """
+    if not scores:
+        return
+    now = datetime.utcnow().isoformat()
+    init_db()
+    with transaction() as cur:
+        cur.executemany('''
+        INSERT OR REPLACE INTO score_memo (resume_hash, jd_hash, config_version, result, created_at)
+        VALUES (?, ?, ?, ?, ?)
+        ''', [(h, jd_hash, config_version, json.dumps(result), now) for h, result in scores])
+
+
+@timed("db.get_scores", size=size_of(0, "resume_hashes"))
+def get_scores(resume_hashes: list, jd_hash: str, config_version: str) -> dict:
+    """Memoized results for (resume, JD, scoring config) pairs, as {resume_hash: result dict}."""
+    found = {}
+    init_db()
+    conn = get_connection()
+    for chunk in _chunks(list(dict.fromkeys(resume_hashes))):
+        rows = conn.execute(
+            f"SELECT resume_hash, result FROM score_memo WHERE jd_hash = ? AND config_version = ? "
+            f"AND resume_hash IN ({','.join('?' * len(chunk))})", [jd_hash, config_version] + chunk
+        ).fetchall()
+        for h, result in rows:
+            found[h] = json.loads(result)
+    return found
+
+
+def get_watched_files(root: str = None) -> dict:
+    """
+    Files seen by the ingestion service, optionally only those under directory `root`.
+    :return: {path: {"size", "mtime", "hash", "status", "error"}}
+    """
+    sql = "SELECT path, size, mtime, content_hash, status, error FROM watched_files"
+    params = []
+    if root:
+        prefix = os.path.join(root, "")
+        sql += " WHERE substr(path, 1, ?) = ?"
+        params = [len(prefix), prefix]
+    init_db()
+    return {
+        path: {"size": size, "mtime": mtime, "hash": h, "status": status, "error": error}
+        for path, size, mtime, h, status, error in get_connection().execute(sql, params).fetchall()
+    }
+
+
+def save_watched_files(files: list):
+    """
+    Record ingested files.
+    :param files: dicts with path, size, mtime, hash, status ("ok"/"error") and error
+    """
+    if not files:
+        return
+    now = datetime.utcnow().isoformat()
+    init_db()
+    with transaction() as cur:
+        cur.executemany('''
+        INSERT OR REPLACE INTO watched_files (path, size, mtime, content_hash, status, error, updated_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+        ''', [(f["path"], f["size"], f["mtime"], f["hash"], f["status"], f.get("error"), now) for f in files])
+
+
+def remove_watched_files(paths: list):
+    """Forget files that disappeared from the watch folder (their documents and scores stay)."""
+    if not paths:
+        return
+    init_db()
+    with transaction() as cur:
+        for chunk in _chunks(list(paths)):
+            cur.execute(f"DELETE FROM watched_files WHERE path IN ({','.join('?' * len(chunk))})", chunk)
+
+
+def activate_jd(jd_hash: str, file_name: str):
+    """Keep scores against this stored JD up to date as resumes are ingested."""
+    init_db()
+    with transaction() as cur:
+        cur.execute(
+            "INSERT OR REPLACE INTO active_jds (jd_hash, file_name, activated_at) VALUES (?, ?, ?)",
+            (jd_hash, file_name, datetime.utcnow().isoformat())
+        )
+
+
+def deactivate_jd(jd_hash: str):
+    init_db()
+    with transaction() as cur:
+        cur.execute("DELETE FROM active_jds WHERE jd_hash = ?", (jd_hash,))
+
+
+def list_active_jds() -> list:
+    """Active JDs as (jd_hash, file_name), oldest first."""
+    init_db()
+    return get_connection().execute("SELECT jd_hash, file_name FROM active_jds ORDER BY activated_at").fetchall()
+
+
+@timed("db.get_ranking")
+def get_ranking(jd_hash: str, config_version: str, limit: int = 100) -> list:
+    """
+    Current ranking of the watched resumes against a JD, best first, read
+    straight from the memoized scores (nothing is recomputed).
+    :return: list of {"path", "hash", "candidate_info", "result"}
+    """
+    init_db()
+    rows = get_connection().execute('''
+    SELECT w.path, s.resume_hash, d.candidate_info, s.result
+    FROM score_memo s
+    JOIN watched_files w ON w.content_hash = s.resume_hash AND w.status = 'ok'
+    LEFT JOIN documents d ON d.content_hash = s.resume_hash
+    WHERE s.jd_hash = ? AND s.config_version = ?
+    ORDER BY json_extract(s.result, '$.final_score') DESC
+    LIMIT ?
+    ''', (jd_hash, config_version, int(limit))).fetchall()
+    return [
+        {"path": path, "hash": h, "candidate_info": json.loads(info) if info else {}, "result": json.loads(result)}
+        for path, h, info, result in rows
+    ]
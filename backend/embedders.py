@@ -0,0 +1,233 @@
+# embedders.py
+"""
+Embedding backends for the semantic matcher, selected by MODEL_CONFIG["backend"]
+(env HIRESIGHT_BACKEND):
+
+    torch   sentence-transformers in fp32, the reference
+    int8    the same model with every Linear layer dynamically quantized to int8
+    onnx    the transformer exported once to ONNX and run with ONNX Runtime
+            (needs `pip install onnxruntime onnx`)
+
+Each backend has the SentenceTransformer encode() signature, so the matcher
+does not care which one is loaded. Check a backend against fp32 with
+
+    python -m backend.embedders --backend int8 --jd jd.pdf --resumes Sample_Data/resumes/
+"""
+import argparse
+import inspect
+import os
+import time
+import numpy as np
+
+BACKENDS = ("torch", "int8", "onnx")
+
+# Exported ONNX graphs, one per model, reused across runs
+ONNX_DIR = os.path.join(os.path.dirname(__file__), "..", "onnx_models")
+
+
+def load_embedder(model_name: str, backend: str = "torch", device: str = None, num_threads: int = None):
+    """
+    Load `model_name` with the given backend.
+    :return: an object with SentenceTransformer's encode()
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown embedding backend: {backend} (expected one of {', '.join(BACKENDS)})")
+    from sentence_transformers import SentenceTransformer
+
+    if num_threads:
+        import torch
+        torch.set_num_threads(num_threads)
+
+    if backend == "torch":
+        return SentenceTransformer(model_name, device=device)
+
+    # Both CPU backends start from the fp32 model on the CPU
+    model = SentenceTransformer(model_name, device="cpu")
+    if backend == "int8":
+        return quantize_int8(model)
+    return OnnxEmbedder(model, onnx_path(model_name), num_threads=num_threads)
+
+
+def quantize_int8(model):
+    """Dynamic int8 quantization of the Linear layers (weights int8, activations quantized per batch)."""
+    import torch
+
+    model.eval()
+    return torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+
+def onnx_path(model_name: str) -> str:
+    return os.path.join(ONNX_DIR, model_name.replace("/", "__") + ".onnx")
+
+
+def _pooling_mode(pooling) -> str:
+    # sentence-transformers 2.x has one flag per mode, later versions a single string
+    mode = getattr(pooling, "pooling_mode", None)
+    if mode is None:
+        mode = "mean" if pooling.pooling_mode_mean_tokens else "cls" if pooling.pooling_mode_cls_token else None
+    if mode not in ("mean", "cls"):
+        raise ValueError(f"ONNX backend supports mean or CLS pooling only, not {mode}")
+    return mode
+
+
+class OnnxEmbedder:
+    """
+    The transformer of a SentenceTransformer run through ONNX Runtime, with
+    the pooling and normalization done in numpy. Only the tokenizer is kept
+    from the torch model; the weights live in the ONNX session.
+    """
+
+    def __init__(self, model, path: str, num_threads: int = None):
+        import onnxruntime as ort
+
+        self.pooling = _pooling_mode(model[1])
+        self.tokenizer = model.tokenizer
+        self.max_seq_length = model.max_seq_length
+
+        if not os.path.exists(path):
+            export_onnx(model, path)
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if num_threads:
+            options.intra_op_num_threads = num_threads
+        self.session = ort.InferenceSession(path, options, providers=["CPUExecutionProvider"])
+        self.input_names = {i.name for i in self.session.get_inputs()}
+
+    def encode(self, sentences, batch_size: int = 32, convert_to_numpy: bool = True,
+               normalize_embeddings: bool = False, **kwargs) -> np.ndarray:
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+        # Longest first, like sentence-transformers, so batches carry little padding
+        order = sorted(range(len(texts)), key=lambda i: -len(texts[i]))
+        out = np.empty((len(texts), 0), dtype=np.float32)
+        for start in range(0, len(texts), batch_size):
+            idx = order[start:start + batch_size]
+            embs = self._encode_batch([texts[i] for i in idx])
+            if out.shape[1] == 0:
+                out = np.empty((len(texts), embs.shape[1]), dtype=np.float32)
+            out[idx] = embs
+        if normalize_embeddings and len(out):
+            out /= np.maximum(np.linalg.norm(out, axis=1, keepdims=True), 1e-12)
+        return out[0] if single else out
+
+    def _encode_batch(self, texts: list) -> np.ndarray:
+        features = self.tokenizer(
+            texts, padding=True, truncation=True, max_length=self.max_seq_length, return_tensors="np"
+        )
+        feeds = {k: v.astype(np.int64) for k, v in features.items() if k in self.input_names}
+        hidden = self.session.run(None, feeds)[0]
+        if self.pooling == "cls":
+            return hidden[:, 0].astype(np.float32)
+        mask = features["attention_mask"][..., None].astype(np.float32)
+        return ((hidden * mask).sum(axis=1) / np.maximum(mask.sum(axis=1), 1e-9)).astype(np.float32)
+
+
+def export_onnx(model, path: str):
+    """Export the transformer of a SentenceTransformer to `path` (token embeddings output)."""
+    import torch
+
+    transformer = model[0].auto_model.eval()
+    sample = model.tokenizer(["export sample"], return_tensors="pt")
+    names = [n for n in ("input_ids", "attention_mask", "token_type_ids") if n in sample]
+
+    class TokenEmbeddings(torch.nn.Module):
+        def __init__(self, inner):
+            super().__init__()
+            self.inner = inner
+
+        def forward(self, *inputs):
+            return self.inner(**dict(zip(names, inputs)))[0]
+
+    # torch >= 2.5 takes `dynamo` (and may default to the new exporter); older
+    # versions, e.g. the one sentence-transformers 2.2.2 installs, reject the keyword
+    exporter = {"dynamo": False} if "dynamo" in inspect.signature(torch.onnx.export).parameters else {}
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + ".tmp"
+    with torch.no_grad():
+        torch.onnx.export(
+            TokenEmbeddings(transformer), tuple(sample[n] for n in names), tmp_path,
+            input_names=names, output_names=["token_embeddings"],
+            dynamic_axes={**{n: {0: "batch", 1: "sequence"} for n in names},
+                          "token_embeddings": {0: "batch", 1: "sequence"}},
+            opset_version=17, **exporter,
+        )
+    os.replace(tmp_path, path)
+
+
+def _timed_encode(model, texts: list, batch_size: int) -> tuple:
+    start = time.perf_counter()
+    embs = np.asarray(
+        model.encode(texts, batch_size=batch_size, convert_to_numpy=True, normalize_embeddings=True),
+        dtype=np.float32
+    )
+    return embs, time.perf_counter() - start
+
+
+def parity_check(resume_texts: list, jd_text: str, backend: str, reference: str = "torch",
+                 model_name: str = None, batch_size: int = 32, tolerance: float = 1.0) -> dict:
+    """
+    Score drift of `backend` against `reference` (fp32 by default) on real
+    texts. Both models are loaded fresh and nothing goes through the
+    embedding cache. The hard score does not depend on the backend, so the
+    final score moves by half the semantic drift.
+    :param tolerance: largest acceptable semantic drift, in score points
+    :return: dict with embedding cosine, semantic/final drift, throughput and ok
+    """
+    from backend.matcher import MODEL_CONFIG
+
+    model_name = model_name or MODEL_CONFIG["model_name"]
+    texts = [jd_text] + list(resume_texts)
+    runs = {}
+    for name in (reference, backend):
+        model = load_embedder(model_name, name, device="cpu", num_threads=MODEL_CONFIG["num_threads"])
+        _timed_encode(model, texts[:2], batch_size)  # warm up
+        runs[name] = _timed_encode(model, texts, batch_size)
+        del model
+
+    (ref, ref_s), (cand, cand_s) = runs[reference], runs[backend]
+    cosine = (ref * cand).sum(axis=1)
+    ref_scores = np.round(ref[1:] @ ref[0] * 100, 2)
+    cand_scores = np.round(cand[1:] @ cand[0] * 100, 2)
+    drift = np.abs(ref_scores - cand_scores)
+    return {
+        "backend": backend,
+        "reference": reference,
+        "texts": len(texts),
+        "cosine_mean": round(float(cosine.mean()), 5),
+        "cosine_min": round(float(cosine.min()), 5),
+        "soft_drift_mean": round(float(drift.mean()), 3) if len(drift) else 0.0,
+        "soft_drift_max": round(float(drift.max()), 3) if len(drift) else 0.0,
+        "final_drift_max": round(float(drift.max()) / 2, 3) if len(drift) else 0.0,
+        "reference_texts_per_s": round(len(texts) / ref_s, 1),
+        "backend_texts_per_s": round(len(texts) / cand_s, 1),
+        "speedup": round(ref_s / cand_s, 2),
+        "ok": bool(len(drift) == 0 or drift.max() <= tolerance),
+    }
+
+
+def main(argv=None):
+    from backend.rank import list_resumes
+    from backend.resume_parser import extract_text, normalize_text
+
+    parser = argparse.ArgumentParser(description="Compare an embedding backend with the fp32 model.")
+    parser.add_argument("--backend", required=True, choices=BACKENDS)
+    parser.add_argument("--reference", default="torch", choices=BACKENDS)
+    parser.add_argument("--jd", required=True, help="job description file (PDF/DOCX/TXT)")
+    parser.add_argument("--resumes", required=True, help="directory of resumes")
+    parser.add_argument("--model", default=None, help="model name (default: MODEL_CONFIG)")
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--tolerance", type=float, default=1.0, help="max semantic drift in score points")
+    args = parser.parse_args(argv)
+
+    jd_text = normalize_text(extract_text(args.jd))
+    resume_texts = [normalize_text(extract_text(p)) for p in list_resumes(args.resumes)]
+    report = parity_check(resume_texts, jd_text, args.backend, reference=args.reference, model_name=args.model,
+                          batch_size=args.batch_size, tolerance=args.tolerance)
+    for key, value in report.items():
+        print(f"{key:>22}: {value}")
+    raise SystemExit(0 if report["ok"] else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+# embedding_cache.py
+import sqlite3
+import os
+import time
+import hashlib
+import numpy as np
+
+CACHE_PATH = os.path.join(os.path.dirname(__file__), "..", "embeddings.db")
+
+# Upper bound on stored vectors; least recently used rows are evicted past this.
+MAX_ENTRIES = 50000
+
+
+def _connect():
+    conn = sqlite3.connect(CACHE_PATH, timeout=30)
+    conn.execute('''
+    CREATE TABLE IF NOT EXISTS embeddings (
+        key TEXT PRIMARY KEY,
+        model_name TEXT,
+        dim INTEGER,
+        vector BLOB,
+        last_used REAL
+    )
+    ''')
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_embeddings_last_used ON embeddings(last_used)")
+    return conn
+
+
+def cache_key(text: str, model_name: str) -> str:
+    """Content address for a text under a given model (whitespace-normalized)."""
+    normalized = " ".join(text.split())
+    return hashlib.sha256(f"{model_name}\0{normalized}".encode("utf-8")).hexdigest()
+
+
+def get_embeddings(keys: list) -> dict:
+    """
+    Look up cached float32 vectors.
+    Returns {key: np.ndarray} for the keys that were found and marks them as used.
+    """
+    if not keys:
+        return {}
+    found = {}
+    conn = _connect()
+    try:
+        unique = list(dict.fromkeys(keys))
+        # Stay well below SQLite's host-parameter limit
+        for i in range(0, len(unique), 500):
+            chunk = unique[i:i + 500]
+            marks = ",".join("?" * len(chunk))
+            rows = conn.execute(f"SELECT key, vector FROM embeddings WHERE key IN ({marks})", chunk).fetchall()
+            for key, blob in rows:
+                found[key] = np.frombuffer(blob, dtype=np.float32)
+        if found:
+            now = time.time()
+            conn.executemany("UPDATE embeddings SET last_used = ? WHERE key = ?", [(now, k) for k in found])
+            conn.commit()
+    finally:
+        conn.close()
+    return found
+
+
+def put_embeddings(keys: list, embeddings, model_name: str):
+    """Store vectors (one row per key) and evict least recently used rows past MAX_ENTRIES."""
+    if not len(keys):
+        return
+    embeddings = np.asarray(embeddings, dtype=np.float32)
+    now = time.time()
+    conn = _connect()
+    try:
+        conn.executemany(
+            "INSERT OR REPLACE INTO embeddings (key, model_name, dim, vector, last_used) VALUES (?, ?, ?, ?, ?)",
+            [(k, model_name, int(vec.shape[0]), vec.tobytes(), now) for k, vec in zip(keys, embeddings)]
+        )
+        conn.execute('''
+        DELETE FROM embeddings WHERE key IN (
+            SELECT key FROM embeddings ORDER BY last_used DESC LIMIT -1 OFFSET ?
+        )
+        ''', (MAX_ENTRIES,))
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def clear_cache():
+    """Drop every cached embedding."""
+    conn = _connect()
+    try:
+        conn.execute("DELETE FROM embeddings")
+        conn.commit()
+    finally:
+        conn.close()
@@ -0,0 +1,272 @@
+# ingest.py
+"""
+Watch-folder ingestion service.
+
+    python -m backend.ingest --watch /srv/resume-drop --jd jd.pdf [--jd other.pdf]
+
+Polls the folder every --interval seconds. New or changed resumes go through
+a bounded queue to a worker that extracts them (process pool), stores text
+and candidate info in results.db, and scores them against every active JD,
+so db.get_ranking() is always current with no batch recompute. Scoring
+embeds each resume once; the vector is kept in the embedding cache
+(embedding_cache.py) and reused for later JDs.
+
+When the queue is full the scanner waits, so a large drop never holds more
+than --queue-size files in flight. Polling (scandir + stat) needs no extra
+dependency and also works on network shares, where file system events often
+don't arrive.
+"""
+import argparse
+import os
+import queue
+import sys
+import threading
+import time
+
+from backend.db import (
+    activate_jd, list_active_jds, get_watched_files, save_watched_files, remove_watched_files,
+    get_scores, get_ranking
+)
+from backend.instrumentation import timer
+from backend.matcher import scoring_config_version
+from backend.pipeline import load_jd, load_resumes, load_stored, score_resumes
+from backend.rank import list_resumes
+
+BACKFILL_CHUNK = 256
+
+
+class IngestService:
+    """
+    Scanner (caller's thread) -> bounded queue -> one worker thread.
+    The worker also owns the active-JD set: a JD activated from anywhere
+    (CLI, another process) is picked up within one poll interval and
+    backfilled against every resume already ingested.
+    """
+
+    def __init__(self, watch_dir: str, interval: float = 5.0, batch_size: int = 16, queue_size: int = 64,
+                 max_workers: int = None, settle: float = 2.0, log=None):
+        """
+        :param batch_size: files extracted, embedded and scored together
+        :param queue_size: most files waiting for the worker before the scanner blocks
+        :param max_workers: extraction processes (default: CPU count)
+        :param settle: seconds a file must be unmodified before it is picked up (still being copied)
+        :param log: callable taking a message, e.g. print; None for silence
+        """
+        self.watch_dir = os.path.abspath(watch_dir)
+        self.interval = interval
+        self.batch_size = batch_size
+        self.max_workers = max_workers
+        self.settle = settle
+        self.log = log or (lambda message: None)
+        self.stats = {"scans": 0, "queued": 0, "ingested": 0, "failed": 0, "removed": 0, "scored": 0}
+
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._pending = set()     # paths queued or being processed
+        self._pending_lock = threading.Lock()
+        self._jds = {}            # jd_hash -> jd doc, for active JDs already backfilled
+        self._stop = threading.Event()
+        self._worker = threading.Thread(target=self._work, name="ingest-worker", daemon=True)
+
+    def start(self):
+        self._worker.start()
+        return self
+
+    def stop(self, timeout: float = None):
+        self._stop.set()
+        self._worker.join(timeout)
+
+    def add_jd(self, path: str) -> dict:
+        """Load a JD file and make it active; the worker backfills its scores."""
+        with open(path, "rb") as f:
+            jd_doc = load_jd(os.path.basename(path), f.read())
+        activate_jd(jd_doc["hash"], jd_doc["file_name"])
+        return jd_doc
+
+    def scan_once(self) -> int:
+        """
+        Queue every new or changed file and forget deleted ones.
+        Blocks while the queue is full. :return: number of files queued
+        """
+        known = get_watched_files(self.watch_dir)
+        seen, queued, now = set(), 0, time.time()
+        for path in list_resumes(self.watch_dir):
+            try:
+                st = os.stat(path)
+            except FileNotFoundError:
+                continue
+            seen.add(path)
+            prev = known.get(path)
+            if prev and prev["size"] == st.st_size and prev["mtime"] == st.st_mtime:
+                continue
+            if now - st.st_mtime < self.settle:
+                continue  # picked up by a later scan once the copy has finished
+            with self._pending_lock:
+                if path in self._pending:
+                    continue
+                self._pending.add(path)
+            if not self._put((path, st.st_size, st.st_mtime)):
+                return queued
+            queued += 1
+
+        removed = [p for p in known if p not in seen]
+        remove_watched_files(removed)
+        self.stats["scans"] += 1
+        self.stats["queued"] += queued
+        self.stats["removed"] += len(removed)
+        if removed:
+            self.log(f"Removed {len(removed)} deleted files")
+        return queued
+
+    def _put(self, item) -> bool:
+        # Backpressure: wait for room, but give up when stopping
+        while not self._stop.is_set():
+            try:
+                self._queue.put(item, timeout=0.5)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def drain(self):
+        """Wait until every queued file has been processed."""
+        self._queue.join()
+
+    def run_forever(self):
+        """Scan every `interval` seconds until stop() (or Ctrl+C)."""
+        self.start()
+        try:
+            while not self._stop.is_set():
+                self.scan_once()
+                self._stop.wait(self.interval)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.stop()
+
+    def _work(self):
+        while not self._stop.is_set():
+            try:
+                batch = [self._queue.get(timeout=0.5)]
+            except queue.Empty:
+                self.sync_jds()
+                continue
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                self.sync_jds()
+                self._ingest(batch)
+            except Exception as e:
+                self.log(f"Batch of {len(batch)} failed: {type(e).__name__}: {e}")
+            finally:
+                with self._pending_lock:
+                    self._pending.difference_update(path for path, _, _ in batch)
+                for _ in batch:
+                    self._queue.task_done()
+
+    def _ingest(self, batch: list):
+        files, records = [], []
+        for path, size, mtime in batch:
+            try:
+                with open(path, "rb") as f:
+                    files.append((path, f.read()))
+            except OSError as e:
+                records.append({"path": path, "size": size, "mtime": mtime, "hash": None,
+                                "status": "error", "error": str(e)})
+        meta = {path: (size, mtime) for path, size, mtime in batch}
+
+        with timer("ingest.batch", len(files)):
+            docs = load_resumes(files, max_workers=self.max_workers)
+            del files
+            ok = [d for d in docs if not d["error"]]
+            for doc in docs:
+                size, mtime = meta[doc["file_name"]]
+                records.append({"path": doc["file_name"], "size": size, "mtime": mtime, "hash": doc["hash"],
+                                "status": "error" if doc["error"] else "ok", "error": doc["error"]})
+            if ok:
+                for jd_doc in self._jds.values():
+                    score_resumes(jd_doc, ok)
+                    self.stats["scored"] += len(ok)
+        # Recorded last: a crash mid-batch leaves the files to be picked up again
+        save_watched_files(records)
+
+        failed = sum(1 for r in records if r["status"] == "error")
+        self.stats["ingested"] += len(records) - failed
+        self.stats["failed"] += failed
+        self.log(f"Ingested {len(records) - failed} resumes ({failed} failed), "
+                 f"scored against {len(self._jds)} JDs")
+
+    def sync_jds(self):
+        """Follow the active_jds table; newly active JDs are scored against every ingested resume."""
+        active = dict(list_active_jds())
+        for h in list(self._jds):
+            if h not in active:
+                del self._jds[h]
+        new = [h for h in active if h not in self._jds]
+        for jd_doc in load_stored(new):
+            if self._backfill(jd_doc):
+                self._jds[jd_doc["hash"]] = jd_doc
+
+    def _backfill(self, jd_doc: dict) -> bool:
+        """Score every ingested resume missing from the memo. :return: False if stopped part way"""
+        hashes = list(dict.fromkeys(
+            f["hash"] for f in get_watched_files(self.watch_dir).values() if f["status"] == "ok"
+        ))
+        memo = get_scores(hashes, jd_doc["hash"], scoring_config_version())
+        missing = [h for h in hashes if h not in memo]
+        for i in range(0, len(missing), BACKFILL_CHUNK):
+            # The worker gives up on stop(); a caller syncing after stop() (--once) runs to the end
+            if self._stop.is_set() and threading.current_thread() is self._worker:
+                return False
+            docs = load_stored(missing[i:i + BACKFILL_CHUNK])
+            if docs:
+                score_resumes(jd_doc, docs)
+                self.stats["scored"] += len(docs)
+        if missing:
+            self.log(f"Backfilled {len(missing)} scores for {jd_doc['file_name']}")
+        return True
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Ingest resumes dropped into a folder and keep rankings current.")
+    parser.add_argument("--watch", required=True, help="directory to watch (searched recursively)")
+    parser.add_argument("--jd", action="append", default=[], help="JD file to activate (repeatable)")
+    parser.add_argument("--interval", type=float, default=5.0, help="seconds between scans")
+    parser.add_argument("--batch-size", type=int, default=16, help="files processed together")
+    parser.add_argument("--queue-size", type=int, default=64, help="files in flight before scanning waits")
+    parser.add_argument("--workers", type=int, default=None, help="extraction processes (default: CPU count)")
+    parser.add_argument("--settle", type=float, default=2.0, help="seconds a file must be unchanged")
+    parser.add_argument("--once", action="store_true", help="scan once, process everything and exit")
+    parser.add_argument("--top", type=int, default=0, help="with --once, print the top N per active JD")
+    parser.add_argument("--quiet", action="store_true", help="no progress output")
+    args = parser.parse_args(argv)
+
+    log = None if args.quiet else (lambda message: print(message, file=sys.stderr))
+    service = IngestService(args.watch, interval=args.interval, batch_size=args.batch_size,
+                            queue_size=args.queue_size, max_workers=args.workers, settle=args.settle, log=log)
+    for path in args.jd:
+        service.add_jd(path)
+
+    if not args.once:
+        service.run_forever()
+        return
+
+    service.start()
+    service.scan_once()
+    service.drain()
+    service.stop()
+    service.sync_jds()  # JDs the worker had not backfilled yet, e.g. when nothing new was ingested
+    version = scoring_config_version()
+    for jd_hash, file_name in list_active_jds():
+        if not args.top:
+            break
+        print(f"\n{file_name}")
+        for row in get_ranking(jd_hash, version, limit=args.top):
+            name = row["candidate_info"].get("name") or os.path.basename(row["path"])
+            print(f"  {row['result']['final_score']:6.2f}  {row['result']['verdict']:<6}  {name}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,208 @@
+# instrumentation.py
+import cProfile
+import functools
+import io
+import json
+import os
+import pstats
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+# Off unless HIRESIGHT_METRICS=1 or enable() is called; when off, every
+# instrumented call costs one attribute check.
+ENABLED = os.environ.get("HIRESIGHT_METRICS", "0") == "1"
+
+# Latency histogram bucket upper bounds, in seconds (Prometheus style, cumulative on export)
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+_lock = threading.Lock()
+_stages = {}
+_caches = {}
+_profiles = deque(maxlen=5)
+
+
+def enable():
+    global ENABLED
+    ENABLED = True
+
+
+def disable():
+    global ENABLED
+    ENABLED = False
+
+
+def reset():
+    """Forget every recorded metric and profile."""
+    with _lock:
+        _stages.clear()
+        _caches.clear()
+        _profiles.clear()
+
+
+def record(stage: str, seconds: float, size: int = None):
+    """Add one call of `stage` taking `seconds` (and optionally processing `size` chars/bytes)."""
+    with _lock:
+        s = _stages.get(stage)
+        if s is None:
+            s = _stages[stage] = {"count": 0, "sum": 0.0, "max": 0.0, "buckets": [0] * (len(BUCKETS) + 1),
+                                  "size_count": 0, "size_sum": 0, "size_max": 0}
+        s["count"] += 1
+        s["sum"] += seconds
+        s["max"] = max(s["max"], seconds)
+        for i, bound in enumerate(BUCKETS):
+            if seconds <= bound:
+                s["buckets"][i] += 1
+                break
+        else:
+            s["buckets"][-1] += 1
+        if size is not None:
+            s["size_count"] += 1
+            s["size_sum"] += size
+            s["size_max"] = max(s["size_max"], size)
+
+
+def record_cache(cache: str, hits: int = 0, misses: int = 0):
+    """Count lookups of a named cache."""
+    if not ENABLED:
+        return
+    with _lock:
+        c = _caches.setdefault(cache, {"hits": 0, "misses": 0})
+        c["hits"] += hits
+        c["misses"] += misses
+
+
+def size_of(index: int = 0, name: str = None):
+    """size= helper for timed(): len() of the positional argument `index` (or keyword `name`)."""
+    def size(args, kwargs):
+        value = args[index] if len(args) > index else kwargs.get(name)
+        return len(value) if value is not None else None
+    return size
+
+
+def timed(stage: str, size=None):
+    """
+    Decorator recording the latency of every call under `stage`.
+    :param size: optional callable (args, kwargs) -> int giving the document size of the call
+    """
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not ENABLED:
+                return fn(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                elapsed = time.perf_counter() - start
+                record(stage, elapsed, size(args, kwargs) if size else None)
+        return wrapper
+    return decorator
+
+
+@contextmanager
+def timer(stage: str, size: int = None):
+    """Context-manager form of timed()."""
+    if not ENABLED:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(stage, time.perf_counter() - start, size)
+
+
+def _percentile(s: dict, q: float) -> float:
+    """Upper bucket bound containing the q-th quantile (approximate, like Prometheus)."""
+    target = q * s["count"]
+    seen = 0
+    for bound, n in zip(BUCKETS + (float("inf"),), s["buckets"]):
+        seen += n
+        if seen >= target:
+            return s["max"] if bound == float("inf") else bound
+    return s["max"]
+
+
+def snapshot() -> dict:
+    """Current metrics as plain data."""
+    with _lock:
+        stages = {
+            name: {
+                "count": s["count"],
+                "total_s": round(s["sum"], 6),
+                "mean_ms": round(s["sum"] / s["count"] * 1000, 3),
+                "p50_ms": round(_percentile(s, 0.50) * 1000, 3),
+                "p95_ms": round(_percentile(s, 0.95) * 1000, 3),
+                "max_ms": round(s["max"] * 1000, 3),
+                "mean_size": round(s["size_sum"] / s["size_count"], 1) if s["size_count"] else None,
+                "max_size": s["size_max"] if s["size_count"] else None,
+                "buckets": dict(zip([str(b) for b in BUCKETS] + ["+Inf"], s["buckets"])),
+            }
+            for name, s in _stages.items()
+        }
+        caches = {
+            name: dict(c, hit_rate=round(c["hits"] / (c["hits"] + c["misses"]), 4) if c["hits"] + c["misses"] else None)
+            for name, c in _caches.items()
+        }
+    return {"enabled": ENABLED, "stages": stages, "caches": caches}
+
+
+def to_json() -> str:
+    return json.dumps(snapshot(), indent=2)
+
+
+def to_prometheus() -> str:
+    """Metrics in the Prometheus text exposition format."""
+    lines = [
+        "# HELP hiresight_stage_seconds Latency of instrumented pipeline stages.",
+        "# TYPE hiresight_stage_seconds histogram",
+    ]
+    with _lock:
+        for name, s in sorted(_stages.items()):
+            cumulative = 0
+            for bound, n in zip(BUCKETS, s["buckets"]):
+                cumulative += n
+                lines.append(f'hiresight_stage_seconds_bucket{{stage="{name}",le="{bound}"}} {cumulative}')
+            lines.append(f'hiresight_stage_seconds_bucket{{stage="{name}",le="+Inf"}} {s["count"]}')
+            lines.append(f'hiresight_stage_seconds_sum{{stage="{name}"}} {s["sum"]:.6f}')
+            lines.append(f'hiresight_stage_seconds_count{{stage="{name}"}} {s["count"]}')
+        lines += ["# HELP hiresight_stage_size_sum Total document size processed per stage.",
+                  "# TYPE hiresight_stage_size_sum counter"]
+        for name, s in sorted(_stages.items()):
+            if s["size_count"]:
+                lines.append(f'hiresight_stage_size_sum{{stage="{name}"}} {s["size_sum"]}')
+        lines += ["# HELP hiresight_cache_lookups_total Cache lookups by result.",
+                  "# TYPE hiresight_cache_lookups_total counter"]
+        for name, c in sorted(_caches.items()):
+            lines.append(f'hiresight_cache_lookups_total{{cache="{name}",result="hit"}} {c["hits"]}')
+            lines.append(f'hiresight_cache_lookups_total{{cache="{name}",result="miss"}} {c["misses"]}')
+    return "\n".join(lines) + "\n"
+
+
+@contextmanager
+def profiled(name: str, top: int = 40, dump_path: str = None):
+    """
+    Run the enclosed block under cProfile (opt-in, independent of ENABLED).
+    The top functions by cumulative time are kept for profiles(); dump_path
+    also writes the raw stats for snakeviz/pstats.
+    """
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield profiler
+    finally:
+        profiler.disable()
+        out = io.StringIO()
+        pstats.Stats(profiler, stream=out).sort_stats("cumulative").print_stats(top)
+        with _lock:
+            _profiles.append({"name": name, "time": time.time(), "stats": out.getvalue()})
+        if dump_path:
+            profiler.dump_stats(dump_path)
+
+
+def profiles() -> list:
+    """The most recent profiles recorded with profiled(), newest last."""
+    with _lock:
+        return list(_profiles)
@@ -1,40 +1,234 @@
+import copy
+import hashlib
 import os
 import re
+import threading
+from collections import OrderedDict
 
-def parse_jd(jd_text: str, file_path: str = None) -> dict:
+from backend.instrumentation import timed, size_of, record_cache
+from backend.matcher import requirement_terms
+from backend.skill_matcher import get_skill_automaton
+
+# Bump when the output of parse_jd changes, so stored parses get redone
+PARSER_VERSION = 5
+
+# Section headings, matched against a whole line (bullet and trailing ":" stripped)
+SECTION_PATTERNS = [
+    ("responsibilities", re.compile(
+        r"(?:key |job |your |main )?(?:responsibilities|duties)|what you(?:'|’)?ll do|what you will do"
+        r"|role overview|the role|your role|about the role|day to day|in this role", re.I)),
+    ("nice_to_have", re.compile(
+        r"nice[ -]to[ -]haves?|good[ -]to[ -]haves?|preferred(?: qualifications| skills)?|bonus(?: points)?"
+        r"|(?:it'?s )?a plus|pluses|desired(?: skills| qualifications)?", re.I)),
+    ("requirements", re.compile(
+        r"(?:key |minimum |basic |job |technical |required )?(?:requirements|qualifications|skills(?: required)?)"
+        r"|must[ -]haves?|who you are|what you(?:'|’)?ll (?:need|bring)|what we(?:'|’)?re looking for"
+        r"|what you bring|eligibility(?: criteria)?|you have|you should have|skills (?:&|and) experience", re.I)),
+    ("benefits", re.compile(
+        r"benefits|perks(?: (?:&|and) benefits)?|what we offer|why join us|compensation|we offer", re.I)),
+    # "About Acme" names a company; "about python" in a sentence does not
+    ("about", re.compile(
+        r"about (?:us|the company|the team|(?-i:[A-Z])[\w ]{0,30})|company overview|who we are", re.I)),
+]
+HEADING_MAX_WORDS = 6
+
+BULLET_RE = re.compile(r"^\s*(?:[●•▪◦‣∙·*\-–]|\d{1,2}[.)](?!\d))\s*")
+# "Requirements: Python, SQL" style headings with their first item on the same line
+INLINE_HEADING_RE = re.compile(r"^([^:]{2,50}):\s*(.*)$")
+# Practical details, not something a resume can match
+DETAIL_KEYS = re.compile(
+    r"location|stipend|salary|ctc|schedule|shift|job types?|employment type|bond|(?:internship )?duration"
+    r"|work mode|start date|openings|pay|batch eligibility", re.I)
+MUST_WORDS = re.compile(r"\b(?:must|required|requirements?|mandatory|essential)\b", re.I)
+NICE_WORDS = re.compile(r"\b(?:nice to have|good to have|preferred|advantageous|a plus|bonus|desirable)\b", re.I)
+# Equal-opportunity and similar legal boilerplate that often follows the last bullet
+BOILERPLATE_RE = re.compile(
+    r"equal opportunity|affirmative action|without regard to|is an equal|reasonable accommodation", re.I)
+TITLE_WORDS = re.compile(
+    r"\b(?:engineer|developer|analyst|scientist|interns?|manager|designer|architect|lead|consultant"
+    r"|specialist|administrator|associate|executive)s?\b", re.I)
+# "Data Engineer Intern", "ML Engineer (Remote)": every word capitalized
+TITLE_CASE_RE = re.compile(r"[(\[]?[A-Z0-9][\w/&+.\-]*[)\]]?(?:[ \t]+(?:[-–|&]|[(\[]?[A-Z0-9][\w/&+.\-]*[)\]]?))*")
+
+# Parsed JDs by content hash; each JD is parsed once per process
+CACHE_SIZE = 128
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def _section_of(heading: str):
+    for name, pattern in SECTION_PATTERNS:
+        if pattern.fullmatch(heading):
+            return name
+    return None
+
+
+def _items(lines: list):
     """
-    Parse a job description into structured fields.
-    :param jd_text: raw text extracted from JD PDF
-    :param file_path: path of JD file (optional, used for extension check)
-    :return: dictionary with role title, must-have, good-to-have, and raw text
+    Yield ("section", name) at every heading, and ("bullet", text) or
+    ("item", text) for every line group, depending on whether it started
+    with a bullet or number. PDF extraction wraps bullets over several lines
+    (and sometimes puts the bullet glyph on a line of its own), so
+    continuation lines are joined onto the item they belong to.
     """
+    current = []
+    bulleted = False
 
-    ext = os.path.splitext(file_path)[1].lower() if file_path else ""
+    def flush():
+        nonlocal bulleted
+        kind, bulleted = ("bullet" if bulleted else "item"), False
+        text = " ".join(current).strip()
+        current.clear()
+        return kind, text
+
+    for raw in lines:
+        line = raw.replace("\u200b", "").strip()
+        if not line:
+            if current:
+                yield flush()
+            continue
+        bullet = BULLET_RE.match(line)
+        body = line[bullet.end():].strip() if bullet else line
+
+        # Headings stand on their own line; a bullet is always an item
+        heading = "" if bullet else body.rstrip(":").strip()
+        inline = None if bullet else INLINE_HEADING_RE.match(body)
+        if heading and len(heading.split()) <= HEADING_MAX_WORDS and _section_of(heading):
+            if current:
+                yield flush()
+            yield "section", _section_of(heading)
+            continue
+        if inline and _section_of(inline.group(1).strip()):
+            if current:
+                yield flush()
+            yield "section", _section_of(inline.group(1).strip())
+            if inline.group(2):
+                yield "item", inline.group(2).strip()
+            continue
+
+        if BOILERPLATE_RE.search(body) and not bullet:
+            if current:
+                yield flush()
+            yield "section", "about"
+        elif bullet or (current and current[-1].endswith((".", ":")) and body[:1].isupper()):
+            if current:
+                yield flush()
+        if bullet:
+            bulleted = True
+        if body:
+            current.append(body)
+    if current:
+        yield flush()
 
-    # Extract role title: first non-empty line
-    lines = [line.strip() for line in jd_text.splitlines() if line.strip()]
-    role_title = lines[0] if lines else "Unknown Role"
 
-    must_have = []
-    good_to_have = []
+def _is_role_title(text: str, max_words: int = 8) -> bool:
+    return bool(text) and len(text.split()) <= max_words and bool(TITLE_WORDS.search(text)) \
+        and not _section_of(text)
 
-    # Heuristics for extracting requirements
-    for line in lines:
-        lower_line = line.lower()
 
-        if "must" in lower_line or "requirement" in lower_line or "who you are" in lower_line:
-            must_have.append(line)
+def _starts_role(kind: str, item: str) -> bool:
+    """
+    "2. Data Engineer Intern": the next role of a multi-role JD starts.
+    A bullet ("- Support the Senior Data Engineer") only counts when it is
+    written like a title.
+    """
+    if not _is_role_title(item, max_words=6) or item.endswith((".", ",")):
+        return False
+    return kind != "bullet" or bool(TITLE_CASE_RE.fullmatch(item))
+
 
-        elif "good" in lower_line or "nice to have" in lower_line or "preferred" in lower_line:
-            good_to_have.append(line)
+def _role_title(lines: list) -> str:
+    """First short line naming a role, else the first line."""
+    for line in lines[:15]:
+        text = BULLET_RE.sub("", line).strip().rstrip(":")
+        if _is_role_title(text):
+            return text
+    return lines[0] if lines else "Unknown Role"
 
-        # Catch bullet points (●, -, etc.)
-        elif line.startswith("●") or line.startswith("-") or re.match(r"^\d+\.", line):
-            must_have.append(line)
 
+def _parse(jd_text: str) -> dict:
+    lines = [line.strip() for line in jd_text.splitlines() if line.strip()]
+    sections = {"responsibilities": [], "requirements": [], "nice_to_have": [], "benefits": []}
+    details = {}
+    unsectioned_must, unsectioned_good = [], []
+
+    section = None
+    for kind, item in _items(jd_text.splitlines()):
+        if kind == "section":
+            section = item
+            continue
+        if not item:
+            continue
+        kv = INLINE_HEADING_RE.match(item)
+        if kv and DETAIL_KEYS.fullmatch(kv.group(1).strip()):
+            details[kv.group(1).strip()] = kv.group(2).strip()
+            continue
+        if section is not None and not kv and _starts_role(kind, item):
+            section = None
+            continue
+        if section in sections:
+            if item not in sections[section]:
+                sections[section].append(item)
+        elif section is None:
+            if NICE_WORDS.search(item):
+                unsectioned_good.append(item)
+            else:
+                unsectioned_must.append((item, bool(MUST_WORDS.search(item))))
+
+    # Outside any recognised section only explicit wording counts, unless the JD
+    # has no requirements section at all (a plain list of bullets)
+    role_title = _role_title(lines)
+    plain = not sections["requirements"]
+    must_have = [i for i, explicit in unsectioned_must if explicit or (plain and i != role_title)]
+    must_have += [i for i in sections["requirements"] if not NICE_WORDS.search(i)]
+    good_to_have = (unsectioned_good + [i for i in sections["requirements"] if NICE_WORDS.search(i)]
+                    + sections["nice_to_have"])
+    if not must_have:
+        # Nothing outside the sections either: what the role involves is the best evidence left
+        must_have = list(sections["responsibilities"])
+
+    skills = get_skill_automaton()
     return {
+        "version": PARSER_VERSION,
         "role_title": role_title,
         "must_have": must_have,
         "good_to_have": good_to_have,
+        "responsibilities": sections["responsibilities"],
+        "benefits": sections["benefits"],
+        "details": details,
+        "must_have_skills": sorted(skills.find("\n".join(must_have))),
+        "good_to_have_skills": sorted(skills.find("\n".join(good_to_have))),
+        "must_have_terms": sorted(set().union(*map(requirement_terms, must_have))),
+        "good_to_have_terms": sorted(set().union(*map(requirement_terms, good_to_have))),
         "raw_text": jd_text
     }
+
+
+@timed("jd_parser.parse_jd", size=size_of(0, "jd_text"))
+def parse_jd(jd_text: str, file_path: str = None) -> dict:
+    """
+    Parse a job description into structured fields.
+    Sections (responsibilities / requirements / nice-to-have / benefits) are
+    detected in one pass over the lines; requirement bullets become must_have,
+    nice-to-have ones good_to_have. Results are cached by content hash.
+    :param jd_text: raw text extracted from JD PDF
+    :param file_path: path of JD file (optional, used for extension check)
+    :return: dictionary with role title, must-have, good-to-have, and raw text,
+             plus responsibilities, benefits, details and normalized skills/terms
+    """
+    ext = os.path.splitext(file_path)[1].lower() if file_path else ""
+
+    key = hashlib.sha256(jd_text.encode("utf-8")).hexdigest()
+    with _cache_lock:
+        parsed = _cache.get(key)
+        if parsed is not None:
+            _cache.move_to_end(key)
+    record_cache("jd_parse", hits=int(parsed is not None), misses=int(parsed is None))
+    if parsed is None:
+        parsed = _parse(jd_text)
+        with _cache_lock:
+            _cache[key] = parsed
+            while len(_cache) > CACHE_SIZE:
+                _cache.popitem(last=False)
+    # Callers get their own copy, so the cached parse can't be mutated
+    return copy.deepcopy(parsed)
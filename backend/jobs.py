@@ -0,0 +1,134 @@
+# jobs.py
+import itertools
+import queue
+import threading
+import time
+from contextlib import nullcontext
+
+from backend.instrumentation import profiled
+from backend.pipeline import load_resumes, score_resumes
+from backend.result_store import ResultStore
+
+
+class RankingJob:
+    """
+    Bulk ranking of many resumes against one JD on a background thread.
+    Files are pulled from `files` one chunk at a time and each chunk's bytes
+    and texts are dropped once it is scored; results go to a ResultStore on
+    disk, so memory stays flat however many resumes are ranked. The worker
+    reports progress on a queue; poll() drains it, so a UI can show partial
+    results (read from self.store) while the rest is still being processed.
+    Scores are memoized in the DB by score_resumes, so finished work is never
+    redone even if the job is started again.
+    """
+
+    def __init__(self, key, jd_doc: dict, files, chunk_size: int = 16, batch_size: int = 32,
+                 max_workers: int = None, profile: bool = False, total: int = None):
+        """
+        :param key: identifies the inputs, so callers can tell if a job is for the current upload
+        :param files: iterable of (file_name, bytes) pairs, consumed lazily (a generator is fine)
+        :param profile: run the worker under cProfile (see instrumentation.profiles())
+        :param total: number of files, when `files` has no len()
+        """
+        self.key = key
+        self.jd_doc = jd_doc
+        self.total = total if total is not None else len(files)
+        self.chunk_size = chunk_size
+        self.batch_size = batch_size
+        self.max_workers = max_workers
+        self.profile = profile
+
+        self.store = ResultStore()  # {"candidate_name", "file_name", "result"} rows
+        self.ranked = 0
+        self.errors = []     # (file_name, error message)
+        self.processed = 0
+        self.status = "pending"
+        self.error = None
+        self.started_at = None
+        self.finished_at = None
+
+        self._files = iter(files)
+        self._queue = queue.Queue()
+        self._cancel = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="ranking-job", daemon=True)
+
+    def start(self):
+        self.status = "running"
+        self.started_at = time.time()
+        self._thread.start()
+        return self
+
+    def cancel(self):
+        self._cancel.set()
+
+    def close(self):
+        """Cancel the job and delete its spilled results."""
+        self.cancel()
+        self.store.close()
+
+    @property
+    def running(self) -> bool:
+        return self.status == "running" or not self._queue.empty()
+
+    def _run(self):
+        with profiled(f"bulk ranking ({self.total} resumes)") if self.profile else nullcontext():
+            self._process()
+
+    def _process(self):
+        try:
+            while True:
+                if self._cancel.is_set():
+                    self._queue.put(("status", "cancelled"))
+                    return
+                chunk = list(itertools.islice(self._files, self.chunk_size))
+                if not chunk:
+                    break
+
+                docs, errors = [], []
+                for doc in load_resumes(chunk, max_workers=self.max_workers):
+                    if doc["error"]:
+                        errors.append((doc["file_name"], doc["error"]))
+                    else:
+                        docs.append(doc)
+                count = len(chunk)
+                del chunk
+                results = score_resumes(self.jd_doc, docs, batch_size=self.batch_size) if docs else []
+                self.store.add([
+                    {
+                        "candidate_name": doc["candidate_info"].get("name") or doc["file_name"],
+                        "file_name": doc["file_name"],
+                        "result": result,
+                    }
+                    for doc, result in zip(docs, results)
+                ])
+                self._queue.put(("chunk", (len(results), errors, count)))
+                del docs, results
+            self._queue.put(("status", "done"))
+        except Exception as e:
+            self._queue.put(("status", "failed", f"{type(e).__name__}: {e}"))
+
+    def poll(self) -> int:
+        """Take in progress from the worker. Returns the number of rows added to self.store since the last poll."""
+        new = 0
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                return new
+            if item[0] == "chunk":
+                ranked, errors, count = item[1]
+                self.ranked += ranked
+                self.errors.extend(errors)
+                self.processed += count
+                new += ranked
+            else:
+                self.status = item[1]
+                self.error = item[2] if len(item) > 2 else None
+                self.finished_at = time.time()
+
+    def eta(self) -> float:
+        """Estimated seconds left, from the average rate so far (None until something finished)."""
+        if not self.processed or self.started_at is None:
+            return None
+        elapsed = time.time() - self.started_at
+        return elapsed / self.processed * (self.total - self.processed)
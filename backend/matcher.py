@@ -1,25 +1,154 @@
-from sentence_transformers import SentenceTransformer, util
+import os
+import threading
+from functools import lru_cache
+import numpy as np
 
-# Load model once (avoid reloading on every function call)
-model = SentenceTransformer('sentence-transformers/all-MiniLM-L6-v2')
+from backend.embedding_cache import cache_key, get_embeddings, put_embeddings
+from backend.instrumentation import timed, timer, size_of, record_cache
+from backend.skill_matcher import tokenize
 
+# Model settings, overridable through the environment or configure_model()
+MODEL_CONFIG = {
+    "model_name": os.environ.get("HIRESIGHT_MODEL", "sentence-transformers/all-MiniLM-L6-v2"),
+    "device": os.environ.get("HIRESIGHT_DEVICE") or None,  # None lets sentence-transformers pick
+    "num_threads": int(os.environ.get("HIRESIGHT_NUM_THREADS", "0")) or None,
+    "backend": os.environ.get("HIRESIGHT_BACKEND", "torch"),  # see backend/embedders.py
+}
+
+# Set to False to always recompute embeddings (skips the on-disk store)
+USE_EMBEDDING_CACHE = True
+
+# Long-document mode. pooling "none" embeds whole texts (truncated by the model
+# at 256 word pieces); "mean"/"max" pool chunk embeddings into one vector per
+# document; "align" averages, over JD chunks, the best-matching resume chunk.
+# window/overlap are in words (~180 words fit MiniLM's 256 word pieces).
+CHUNK_CONFIG = {
+    "pooling": os.environ.get("HIRESIGHT_CHUNK_POOLING", "none"),
+    "window": 180,
+    "overlap": 30,
+}
+
+# Loaded on first use by get_model(), shared by every thread in the process
+_model = None
+_model_lock = threading.Lock()
+
+
+def configure_model(model_name: str = None, device: str = None, num_threads: int = None, backend: str = None):
+    """
+    Change model settings. The current model (if any) is dropped and the
+    next get_model() call loads the new one.
+    """
+    global _model
+    with _model_lock:
+        if model_name:
+            MODEL_CONFIG["model_name"] = model_name
+        if device:
+            MODEL_CONFIG["device"] = device
+        if num_threads:
+            MODEL_CONFIG["num_threads"] = num_threads
+        if backend:
+            MODEL_CONFIG["backend"] = backend
+        _model = None
+
+
+def get_model():
+    """
+    Return the process-wide embedding model, loading it on first call with
+    the configured backend (torch / int8 / onnx, see backend/embedders.py).
+    torch / sentence-transformers are only imported here, so code paths that
+    never embed text (hard_match, generate_feedback, ...) don't pay for them.
+    """
+    global _model
+    if _model is None:
+        with _model_lock:
+            if _model is None:
+                from backend.embedders import load_embedder
+
+                with timer("matcher.model_load"):
+                    _model = load_embedder(
+                        MODEL_CONFIG["model_name"], MODEL_CONFIG["backend"],
+                        device=MODEL_CONFIG["device"], num_threads=MODEL_CONFIG["num_threads"]
+                    )
+    return _model
+
+
+def embedding_model_id() -> str:
+    """
+    Names the vectors the current model produces. Quantized/ONNX backends
+    drift slightly from fp32, so their embeddings are cached separately.
+    """
+    backend = MODEL_CONFIG["backend"]
+    return MODEL_CONFIG["model_name"] if backend == "torch" else f"{MODEL_CONFIG['model_name']}#{backend}"
+
+
+def warm_up():
+    """Load the model and run one tiny encode so the first real request is fast."""
+    get_model().encode(["warm up"], convert_to_numpy=True)
+
+# Filler and JD boilerplate words that say nothing about the skill being asked for
+STOPWORDS = frozenset("""
+a an and are as at be by can for from have has in into is it its of on or our per such that the their
+this to we will with you your who what must should good nice plus preferred required requirement
+requirements ability able strong knowledge understanding experience experienced working work skills
+skill years year etc using use least including like well any other one more
+""".split())
+
+# Share of a requirement's key terms that must appear in the resume for it to count as matched
+REQUIREMENT_MATCH_THRESHOLD = 0.6
+
+# Bump whenever scoring logic changes, so memoized scores in the DB are not reused
+SCORING_REVISION = 2
+
+
+def scoring_config_version() -> str:
+    """Identifies everything a stored score depends on (logic revision, JD parser, model, thresholds)."""
+    from backend.jd_parser import PARSER_VERSION  # jd_parser imports this module
+
+    return (
+        f"{SCORING_REVISION}:p{PARSER_VERSION}:{embedding_model_id()}:{REQUIREMENT_MATCH_THRESHOLD}:"
+        f"{CHUNK_CONFIG['pooling']}/{CHUNK_CONFIG['window']}/{CHUNK_CONFIG['overlap']}"
+    )
+
+
+@lru_cache(maxsize=4096)
+def requirement_terms(requirement: str) -> frozenset:
+    """
+    Normalized key terms of one JD requirement line (lowercased tokens, no
+    stopwords or bullet numbers). Cached, so each line is tokenized once
+    however many resumes it is matched against.
+    """
+    return frozenset(
+        t for t in (tok.lower() for tok in tokenize(requirement))
+        if t not in STOPWORDS and not t.isdigit()
+    )
+
+
+def _match_requirements(requirements: list, resume_terms: set) -> tuple:
+    matched, missing = [], []
+    for req in requirements:
+        terms = requirement_terms(req)
+        if not terms:
+            continue  # headings like "Requirements:" carry nothing to match
+        hits = sum(1 for t in terms if t in resume_terms)
+        (matched if hits / len(terms) >= REQUIREMENT_MATCH_THRESHOLD else missing).append(req)
+    return matched, missing
+
+
+@timed("matcher.hard_match", size=size_of(0, "resume_text"))
 def hard_match(resume_text: str, jd_parsed: dict) -> dict:
     """
     Rule-based matching of resume against JD requirements.
+    The resume is tokenized once into a term set; every requirement is then
+    scored by set lookups of its key terms, so cost is linear in text size.
     """
-    resume_text_lower = resume_text.lower()
-    must_have = jd_parsed.get("must_have", [])
-    good_to_have = jd_parsed.get("good_to_have", [])
-
-    must_matched = [req for req in must_have if req.lower() in resume_text_lower]
-    good_matched = [req for req in good_to_have if req.lower() in resume_text_lower]
+    resume_terms = {tok.lower() for tok in tokenize(resume_text)}
 
-    missing_must = [req for req in must_have if req.lower() not in resume_text_lower]
-    missing_good = [req for req in good_to_have if req.lower() not in resume_text_lower]
+    must_matched, missing_must = _match_requirements(jd_parsed.get("must_have", []), resume_terms)
+    good_matched, missing_good = _match_requirements(jd_parsed.get("good_to_have", []), resume_terms)
 
     # Simple scoring rule
     score = (len(must_matched) * 5 + len(good_matched) * 2) / max(
-        1, (len(must_have) * 5 + len(good_to_have) * 2)
+        1, ((len(must_matched) + len(missing_must)) * 5 + (len(good_matched) + len(missing_good)) * 2)
     ) * 100
 
     return {
@@ -31,23 +160,132 @@ def hard_match(resume_text: str, jd_parsed: dict) -> dict:
     }
 
 
+@timed("matcher.encode_texts", size=size_of(0, "texts"))
+def encode_texts(texts: list, batch_size: int = 32) -> np.ndarray:
+    """
+    Unit-normalized float32 embeddings for `texts`, one row per text.
+    Vectors already in the embedding cache are reused; only misses go
+    through `model.encode`, in a single batched call.
+    """
+    texts = list(texts)
+    model_name = embedding_model_id()
+    if not USE_EMBEDDING_CACHE:
+        return get_model().encode(texts, batch_size=batch_size, convert_to_numpy=True, normalize_embeddings=True)
+
+    keys = [cache_key(t, model_name) for t in texts]
+    cached = get_embeddings(keys)
+
+    missing = {}
+    for key, text in zip(keys, texts):
+        if key not in cached and key not in missing:
+            missing[key] = text
+    record_cache("embeddings", hits=len(keys) - len(missing), misses=len(missing))
+    if missing:
+        new_embs = get_model().encode(
+            list(missing.values()), batch_size=batch_size, convert_to_numpy=True, normalize_embeddings=True
+        )
+        put_embeddings(list(missing), new_embs, model_name)
+        cached.update(zip(missing, np.asarray(new_embs, dtype=np.float32)))
+
+    return np.vstack([cached[k] for k in keys]) if keys else np.empty((0, 0), dtype=np.float32)
+
+
+def chunk_text(text: str, window: int = None, overlap: int = None) -> list:
+    """
+    Split text into chunks of at most `window` words. Paragraphs/sections
+    (blank-line separated) are kept together when they fit and packed into
+    one chunk where possible; longer ones are cut into overlapping windows.
+    """
+    window = window or CHUNK_CONFIG["window"]
+    overlap = min(overlap if overlap is not None else CHUNK_CONFIG["overlap"], window - 1)
+
+    chunks, current = [], []
+    for section in text.split("\n\n"):
+        words = section.split()
+        if not words:
+            continue
+        if len(words) > window:
+            if current:
+                chunks.append(" ".join(current))
+                current = []
+            for start in range(0, len(words) - overlap, window - overlap):
+                chunks.append(" ".join(words[start:start + window]))
+        elif len(current) + len(words) > window:
+            chunks.append(" ".join(current))
+            current = words
+        else:
+            current += words
+    if current:
+        chunks.append(" ".join(current))
+    return chunks or [text.strip()]
+
+
+def chunked_similarity_batch(resume_texts: list, jd_text: str, pooling: str = None, batch_size: int = 32) -> list:
+    """
+    Semantic similarity over whole documents: every chunk of every resume and
+    of the JD is encoded in one batched call (chunk embeddings are cached like
+    any other text), then aggregated per resume with `pooling`
+    ("mean", "max" or "align", see CHUNK_CONFIG).
+    """
+    pooling = pooling or CHUNK_CONFIG["pooling"]
+    jd_chunks = chunk_text(jd_text)
+    resume_chunks = [chunk_text(t) for t in resume_texts]
+
+    embs = encode_texts(jd_chunks + [c for chunks in resume_chunks for c in chunks], batch_size=batch_size)
+    jd_embs, offset = embs[:len(jd_chunks)], len(jd_chunks)
+
+    def pooled(chunk_embs):
+        vec = chunk_embs.max(axis=0) if pooling == "max" else chunk_embs.mean(axis=0)
+        return vec / (np.linalg.norm(vec) or 1.0)
+
+    jd_vec = pooled(jd_embs)
+    scores = []
+    for chunks in resume_chunks:
+        chunk_embs = embs[offset:offset + len(chunks)]
+        offset += len(chunks)
+        if pooling == "align":
+            # JD chunks x resume chunks; each JD section takes its best resume section
+            similarity = float((jd_embs @ chunk_embs.T).max(axis=1).mean())
+        else:
+            similarity = float(np.dot(pooled(chunk_embs), jd_vec))
+        scores.append(round(similarity * 100, 2))
+    return scores
+
+
+@timed("matcher.semantic_similarity")
 def semantic_similarity(resume_text: str, jd_text: str) -> float:
     """
     Semantic similarity between resume and job description using embeddings.
     """
-    resume_emb = model.encode(resume_text, convert_to_tensor=True)
-    jd_emb = model.encode(jd_text, convert_to_tensor=True)
-    similarity = util.pytorch_cos_sim(resume_emb, jd_emb).item()
+    if CHUNK_CONFIG["pooling"] != "none":
+        return chunked_similarity_batch([resume_text], jd_text)[0]
+    resume_emb, jd_emb = encode_texts([resume_text, jd_text])
+    similarity = float(np.dot(resume_emb, jd_emb))
     return round(similarity * 100, 2)
 
 
-def final_score(resume_skills: list, jd_parsed: dict, resume_text: str, jd_text: str) -> dict:
+@timed("matcher.semantic_similarity_batch", size=size_of(0, "resume_texts"))
+def semantic_similarity_batch(resume_texts: list, jd_text: str, batch_size: int = 32) -> list:
     """
-    Combine hard and semantic matching for a final weighted score.
+    Semantic similarity of many resumes against one job description.
+    The JD is encoded once, resumes are encoded in mini-batches of `batch_size`
+    and every cosine score comes out of a single matrix product.
     """
-    hard_result = hard_match(resume_text, jd_parsed)
-    soft_score = semantic_similarity(resume_text, jd_text)
+    if not resume_texts:
+        return []
+    if CHUNK_CONFIG["pooling"] != "none":
+        return chunked_similarity_batch(resume_texts, jd_text, batch_size=batch_size)
+
+    jd_emb = encode_texts([jd_text])[0]
+    resume_embs = encode_texts(resume_texts, batch_size=batch_size)
+    similarities = resume_embs @ jd_emb
+    return [round(float(sim) * 100, 2) for sim in np.asarray(similarities, dtype=np.float32)]
 
+
+def _combine_scores(resume_skills: list, hard_result: dict, soft_score: float) -> dict:
+    """
+    Weight hard and semantic scores into the final result dict.
+    """
     # Weighted final score (50% hard, 50% soft)
     final = (hard_result["score"] * 0.5) + (soft_score * 0.5)
 
@@ -64,6 +302,30 @@ def final_score(resume_skills: list, jd_parsed: dict, resume_text: str, jd_text:
     }
 
 
+@timed("matcher.final_score")
+def final_score(resume_skills: list, jd_parsed: dict, resume_text: str, jd_text: str) -> dict:
+    """
+    Combine hard and semantic matching for a final weighted score.
+    """
+    hard_result = hard_match(resume_text, jd_parsed)
+    soft_score = semantic_similarity(resume_text, jd_text)
+    return _combine_scores(resume_skills, hard_result, soft_score)
+
+
+@timed("matcher.final_score_batch", size=size_of(2, "resume_texts"))
+def final_score_batch(resumes_skills: list, jd_parsed: dict, resume_texts: list, jd_text: str,
+                      batch_size: int = 32) -> list:
+    """
+    Score many resumes against one JD. Same result dicts as `final_score`,
+    in input order, but with a single JD encode and batched resume encodes.
+    """
+    soft_scores = semantic_similarity_batch(resume_texts, jd_text, batch_size=batch_size)
+    return [
+        _combine_scores(skills, hard_match(text, jd_parsed), soft)
+        for skills, text, soft in zip(resumes_skills, resume_texts, soft_scores)
+    ]
+
+
 def generate_feedback(jd_parsed: dict, match_result: dict) -> str:
     """
     Generate actionable feedback for the candidate.
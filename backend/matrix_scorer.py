@@ -0,0 +1,116 @@
+# matrix_scorer.py
+import numpy as np
+
+from backend.matcher import (
+    CHUNK_CONFIG, encode_texts, chunked_similarity_batch, hard_match, requirement_terms, _combine_scores,
+    REQUIREMENT_MATCH_THRESHOLD
+)
+from backend.skill_matcher import tokenize
+
+# Same weights as hard_match
+MUST_WEIGHT = 5
+GOOD_WEIGHT = 2
+
+# Python's round() rather than np.round (which scales and rints), so values
+# equal final_score's to the last digit
+_round2 = np.vectorize(lambda x: round(float(x), 2), otypes=[np.float64])
+
+
+def hard_score_matrix(resume_texts: list, jd_parsed_list: list) -> np.ndarray:
+    """
+    hard_match scores for every (resume, JD) pair as an N x M array.
+    All requirements of all JDs share one term vocabulary; requirement hits
+    for every pair come out of one incidence-matrix product instead of
+    N x M calls to hard_match.
+    """
+    # One column per requirement line: (jd index, weight, key terms)
+    requirements = []
+    for j, parsed in enumerate(jd_parsed_list):
+        for weight, key in ((MUST_WEIGHT, "must_have"), (GOOD_WEIGHT, "good_to_have")):
+            for req in parsed.get(key, []):
+                terms = requirement_terms(req)
+                if terms:
+                    requirements.append((j, weight, terms))
+
+    n, m = len(resume_texts), len(jd_parsed_list)
+    if not requirements:
+        return np.zeros((n, m), dtype=np.float32)
+
+    vocab = {t: i for i, t in enumerate(sorted({t for _, _, terms in requirements for t in terms}))}
+    req_terms = np.zeros((len(vocab), len(requirements)), dtype=np.float32)
+    weights = np.zeros((len(requirements), m), dtype=np.float64)
+    for r, (j, weight, terms) in enumerate(requirements):
+        req_terms[[vocab[t] for t in terms], r] = 1.0
+        weights[r, j] = weight
+
+    incidence = np.zeros((n, len(vocab)), dtype=np.float32)
+    for i, text in enumerate(resume_texts):
+        cols = {vocab[t] for t in (tok.lower() for tok in tokenize(text)) if t in vocab}
+        if cols:
+            incidence[i, list(cols)] = 1.0
+
+    coverage = (incidence @ req_terms) / req_terms.sum(axis=0)
+    matched = (coverage >= REQUIREMENT_MATCH_THRESHOLD).astype(np.float64)
+    return (matched @ weights) / np.maximum(1.0, weights.sum(axis=0)) * 100
+
+
+def _top_k(matrix: np.ndarray, k: int) -> np.ndarray:
+    """Column indices of the k largest values in each row, best first."""
+    k = min(k, matrix.shape[1])
+    if k <= 0:
+        return np.empty((matrix.shape[0], 0), dtype=np.int64)
+    idx = np.argpartition(-matrix, k - 1, axis=1)[:, :k]
+    order = np.argsort(-np.take_along_axis(matrix, idx, axis=1), axis=1)
+    return np.take_along_axis(idx, order, axis=1)
+
+
+def score_matrix(resume_texts: list, jd_texts: list, jd_parsed_list: list, top_k: int = 5,
+                 batch_size: int = 32, return_details: bool = False, resume_skills_list: list = None) -> dict:
+    """
+    Score N resumes against M JDs at once.
+    Every resume and JD is embedded exactly once (through the embedding cache),
+    the semantic scores are one N x M matrix product and hard scores come from
+    hard_score_matrix. Scores use the same 50/50 weighting as final_score.
+    With CHUNK_CONFIG pooling other than "none" the semantic scores are
+    computed per JD by chunked_similarity_batch, as final_score does.
+    :return: dict with N x M arrays "hard", "soft" and "final" (rounded to 2 places),
+             "top_jds" (N x k JD indices per resume, best first) and
+             "top_resumes" (M x k resume indices per JD, best first).
+             With return_details=True also "results": N x M nested list of
+             final_score-style dicts (built with hard_match, so much slower);
+             resume_skills_list fills their "resume_skills".
+    """
+    n, m = len(resume_texts), len(jd_texts)
+    if not n or not m:
+        empty = np.zeros((n, m), dtype=np.float32)
+        return {"hard": empty, "soft": empty, "final": empty,
+                "top_jds": np.empty((n, 0), dtype=np.int64), "top_resumes": np.empty((m, 0), dtype=np.int64)}
+
+    if CHUNK_CONFIG["pooling"] != "none":
+        # Chunked modes pool chunk embeddings per document pair; one column per JD
+        # (chunks are encoded once and then come from the embedding cache)
+        soft = np.array([chunked_similarity_batch(resume_texts, jd_text, batch_size=batch_size)
+                         for jd_text in jd_texts], dtype=np.float64).T
+    else:
+        resume_embs = encode_texts(resume_texts, batch_size=batch_size)
+        jd_embs = encode_texts(jd_texts, batch_size=batch_size)
+        soft = _round2((resume_embs @ jd_embs.T).astype(np.float64) * 100)
+    hard = _round2(hard_score_matrix(resume_texts, jd_parsed_list))
+    final = _round2(hard * 0.5 + soft * 0.5)
+
+    scores = {
+        "hard": hard,
+        "soft": soft,
+        "final": final,
+        "top_jds": _top_k(final, top_k),
+        "top_resumes": _top_k(final.T, top_k),
+    }
+    if return_details:
+        scores["results"] = [
+            [
+                _combine_scores(skills, hard_match(text, parsed), float(soft[i, j]))
+                for j, parsed in enumerate(jd_parsed_list)
+            ]
+            for i, (text, skills) in enumerate(zip(resume_texts, resume_skills_list or [[]] * n))
+        ]
+    return scores
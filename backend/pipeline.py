@@ -0,0 +1,124 @@
+# pipeline.py
+from backend.resume_parser import (
+    extract_text_from_bytes, extract_texts_bulk, normalize_text,
+    extract_skills_from_resume, extract_candidate_info
+)
+from backend.jd_parser import parse_jd, PARSER_VERSION
+from backend.matcher import final_score_batch, scoring_config_version
+from backend.db import content_hash, get_documents, save_documents, get_scores, save_scores
+from backend.instrumentation import timed, size_of, record_cache
+
+
+def _refresh_parse(doc: dict):
+    # A stored parse from an older parser is redone (the text is reused)
+    if doc["parsed"] is not None and doc["parsed"].get("version") != PARSER_VERSION:
+        doc["parsed"] = parse_jd(doc["text"], file_path=doc["file_name"])
+        save_documents([doc])
+
+
+@timed("pipeline.load_jd")
+def load_jd(file_name: str, data: bytes) -> dict:
+    """
+    Extract and parse a JD, or reuse the stored copy if these exact bytes were seen before.
+    :return: document dict with hash, file_name, text and parsed (parse_jd output)
+    """
+    h = content_hash(data)
+    doc = get_documents([h]).get(h)
+    record_cache("documents", hits=int(doc is not None), misses=int(doc is None))
+    if doc is not None:
+        _refresh_parse(doc)
+    if doc is None or doc["parsed"] is None:
+        text = normalize_text(extract_text_from_bytes(data, file_name))
+        doc = {
+            "hash": h, "kind": "jd", "file_name": file_name, "text": text,
+            "parsed": parse_jd(text, file_path=file_name), "candidate_info": None,
+        }
+        save_documents([doc])
+    doc["file_name"] = file_name
+    return doc
+
+
+@timed("pipeline.load_resumes", size=size_of(0, "files"))
+def load_resumes(files: list, max_workers: int = None) -> list:
+    """
+    Extract resumes, skipping any whose bytes are already stored.
+    :param files: list of (file_name, bytes) pairs
+    :param max_workers: process pool size for the documents that need extraction
+    :return: document dicts in input order, with hash, file_name, text, skills and
+             candidate_info; unreadable files get an "error" entry instead of text
+    """
+    hashes = [content_hash(data) for _, data in files]
+    docs = get_documents(hashes)
+
+    todo = [(name, data, h) for (name, data), h in zip(files, hashes) if h not in docs]
+    record_cache("documents", hits=len(files) - len(todo), misses=len(todo))
+    extracted = extract_texts_bulk([(name, data) for name, data, _ in todo], max_workers=max_workers)
+
+    new_docs, errors = [], {}
+    for (name, _, h), ex in zip(todo, extracted):
+        if ex["error"]:
+            errors[h] = ex["error"]
+            continue
+        doc = {
+            "hash": h, "kind": "resume", "file_name": name, "text": ex["text"],
+            "parsed": None, "candidate_info": extract_candidate_info(ex["text"]),
+        }
+        docs[h] = doc
+        new_docs.append(doc)
+    save_documents(new_docs)
+
+    results = []
+    for (name, _), h in zip(files, hashes):
+        if h in errors:
+            results.append({"hash": h, "file_name": name, "error": errors[h]})
+            continue
+        # Skills are cheap to detect and follow skills.txt, so they are never stored
+        doc = dict(docs[h], file_name=name, error=None)
+        doc["skills"] = extract_skills_from_resume(doc["text"])
+        results.append(doc)
+    return results
+
+
+def load_stored(hashes: list) -> list:
+    """
+    Documents already in results.db, ready for score_resumes: resumes get
+    their skills detected, JDs parsed by an older parser are re-parsed.
+    :return: document dicts in the order of `hashes` (unknown hashes are skipped)
+    """
+    docs = get_documents(hashes)
+    results = []
+    for h in hashes:
+        if h not in docs:
+            continue
+        doc = dict(docs[h], error=None)
+        if doc["kind"] == "jd":
+            _refresh_parse(doc)
+        else:
+            doc["skills"] = extract_skills_from_resume(doc["text"])
+        results.append(doc)
+    return results
+
+
+@timed("pipeline.score_resumes", size=size_of(1, "resume_docs"))
+def score_resumes(jd_doc: dict, resume_docs: list, batch_size: int = 32) -> list:
+    """
+    final_score for every resume against one JD, reusing memoized results for
+    (resume, JD, scoring config) pairs already evaluated. Only the rest are
+    scored (in one batch) and then memoized.
+    :return: result dicts in the order of resume_docs
+    """
+    version = scoring_config_version()
+    memo = get_scores([d["hash"] for d in resume_docs], jd_doc["hash"], version)
+
+    pending = [d for d in resume_docs if d["hash"] not in memo]
+    record_cache("score_memo", hits=len(resume_docs) - len(pending), misses=len(pending))
+    if pending:
+        scored = final_score_batch(
+            [d["skills"] for d in pending], jd_doc["parsed"], [d["text"] for d in pending], jd_doc["text"],
+            batch_size=batch_size
+        )
+        new_scores = list(zip((d["hash"] for d in pending), scored))
+        save_scores(jd_doc["hash"], version, new_scores)
+        memo.update(new_scores)
+
+    return [dict(memo[d["hash"]], resume_skills=d["skills"]) for d in resume_docs]
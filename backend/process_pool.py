@@ -0,0 +1,37 @@
+# process_pool.py
+"""
+Worker process pools shared by the whole process.
+
+Pools are started on first use and reused by every later call, one pool per
+size, so callers asking for different sizes never shut down a pool another
+thread is using. Workers are spawned, not forked: the parent may already hold
+the model, its threads and open SQLite connections.
+
+Spawned workers import the caller's main module, so a script that uses these
+pools must keep its top-level code under `if __name__ == "__main__":`.
+"""
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_process_pool(workers: int) -> ProcessPoolExecutor:
+    """The shared pool with `workers` processes, started on first use."""
+    with _pools_lock:
+        pool = _pools.get(workers)
+        if pool is None:
+            pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+            _pools[workers] = pool
+        return pool
+
+
+def discard_process_pool(pool: ProcessPoolExecutor):
+    """Forget a broken pool (a worker died); the next get_process_pool starts a fresh one."""
+    with _pools_lock:
+        for workers, known in list(_pools.items()):
+            if known is pool:
+                del _pools[workers]
+    pool.shutdown(wait=False)
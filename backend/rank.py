@@ -0,0 +1,176 @@
+# rank.py
+"""
+Headless bulk ranking of a directory of resumes against one JD.
+
+    python -m backend.rank --jd jd.pdf --resumes Sample_Data/resumes/ --out ranking.csv
+
+Resumes are streamed through extraction, skill detection and scoring in
+chunks, and each chunk is appended to the CSV as soon as it is scored. Re-running
+with the same --out skips resumes already in the file, so an interrupted
+run picks up where it stopped.
+"""
+import argparse
+import csv
+import itertools
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+from contextlib import closing, nullcontext
+
+from backend import instrumentation
+from backend.db import save_evaluations_bulk
+from backend.matcher import generate_feedback
+from backend.pipeline import load_jd, load_resumes, score_resumes
+from backend.result_store import EXPORT_COLUMNS, export_row
+
+RESUME_EXTENSIONS = (".pdf", ".docx", ".doc", ".txt")
+
+
+def list_resumes(directory: str) -> list:
+    """Resume files under `directory` (recursive), in a stable order."""
+    paths = []
+    for root, _, names in os.walk(directory):
+        for name in names:
+            if name.lower().endswith(RESUME_EXTENSIONS):
+                paths.append(os.path.join(root, name))
+    return sorted(paths)
+
+
+def _already_ranked(out_path: str) -> set:
+    if not os.path.exists(out_path):
+        return set()
+    with open(out_path, newline="", encoding="utf-8") as f:
+        return {row["File"] for row in csv.DictReader(f)}
+
+
+def _sort_csv(out_path: str, chunk_size: int = 1000):
+    """Sort the CSV by final score through a temporary SQLite file, so the rows never all sit in memory."""
+    tmp_path = out_path + ".sorting"
+    with tempfile.TemporaryDirectory() as tmp, closing(sqlite3.connect(os.path.join(tmp, "sort.db"))) as conn:
+        conn.execute("CREATE TABLE rows (score REAL, line TEXT)")
+        with open(out_path, newline="", encoding="utf-8") as f:
+            reader = csv.DictReader(f)
+            while True:
+                chunk = list(itertools.islice(reader, chunk_size))
+                if not chunk:
+                    break
+                conn.executemany("INSERT INTO rows VALUES (?, ?)", [
+                    (float(r["Final Score"]), json.dumps([r[c] for c in EXPORT_COLUMNS])) for r in chunk
+                ])
+        with open(tmp_path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(EXPORT_COLUMNS)
+            for (line,) in conn.execute("SELECT line FROM rows ORDER BY score DESC, rowid"):
+                writer.writerow(json.loads(line))
+    os.replace(tmp_path, out_path)
+
+
+def rank_directory(jd_path: str, resume_dir: str, out_path: str, workers: int = None, chunk_size: int = 64,
+                   batch_size: int = 32, save_db: bool = False, progress: bool = True) -> int:
+    """
+    Rank every resume in `resume_dir` against the JD at `jd_path` into a CSV.
+    :return: number of resumes ranked in this run
+    """
+    with open(jd_path, "rb") as f:
+        jd_doc = load_jd(os.path.basename(jd_path), f.read())
+
+    done = _already_ranked(out_path)
+    pending = [p for p in list_resumes(resume_dir) if p not in done]
+    total = len(pending)
+    if progress and done:
+        print(f"Resuming: {len(done)} already ranked, {total} to go", file=sys.stderr)
+
+    write_header = not os.path.exists(out_path) or os.path.getsize(out_path) == 0
+    ranked = 0
+    start = time.perf_counter()
+    with open(out_path, "a", newline="", encoding="utf-8") as out:
+        writer = csv.writer(out)
+        if write_header:
+            writer.writerow(EXPORT_COLUMNS)
+
+        for i in range(0, total, chunk_size):
+            chunk = pending[i:i + chunk_size]
+            files = []
+            for path in chunk:
+                with open(path, "rb") as f:
+                    files.append((path, f.read()))
+
+            docs = []
+            for doc in load_resumes(files, max_workers=workers):
+                if doc["error"]:
+                    print(f"Skipped {doc['file_name']}: {doc['error']}", file=sys.stderr)
+                else:
+                    docs.append(doc)
+            del files
+
+            results = score_resumes(jd_doc, docs, batch_size=batch_size) if docs else []
+            for doc, result in zip(docs, results):
+                writer.writerow(export_row({
+                    "candidate_name": doc["candidate_info"].get("name") or os.path.basename(doc["file_name"]),
+                    "file_name": doc["file_name"],
+                    "result": result,
+                }))
+            out.flush()
+
+            if save_db and results:
+                save_evaluations_bulk([
+                    {
+                        "candidate_name": doc["candidate_info"].get("name") or os.path.basename(doc["file_name"]),
+                        "resume_file": os.path.basename(doc["file_name"]),
+                        "jd_file": jd_doc["file_name"],
+                        "result": result,
+                        "feedback": generate_feedback(jd_doc["parsed"], result),
+                    }
+                    for doc, result in zip(docs, results)
+                ])
+
+            ranked += len(results)
+            if progress:
+                seen = min(i + chunk_size, total)
+                elapsed = time.perf_counter() - start
+                rate = seen / elapsed if elapsed else 0.0
+                eta = (total - seen) / rate if rate else 0.0
+                print(f"[{seen}/{total}] {seen / total:6.1%}  {rate:6.1f} docs/s  ETA {eta:5.0f}s", file=sys.stderr)
+
+    _sort_csv(out_path)
+    return ranked
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Rank a directory of resumes against a job description.")
+    parser.add_argument("--jd", required=True, help="job description file (PDF/DOCX/TXT)")
+    parser.add_argument("--resumes", required=True, help="directory of resumes (searched recursively)")
+    parser.add_argument("--out", default="ranking.csv", help="output CSV (appended to when resuming)")
+    parser.add_argument("--workers", type=int, default=None, help="extraction processes (default: CPU count)")
+    parser.add_argument("--chunk-size", type=int, default=64, help="resumes processed per chunk")
+    parser.add_argument("--batch-size", type=int, default=32, help="embedding batch size")
+    parser.add_argument("--save-db", action="store_true", help="also save evaluations to results.db")
+    parser.add_argument("--fresh", action="store_true", help="ignore an existing --out file and start over")
+    parser.add_argument("--quiet", action="store_true", help="no progress output")
+    parser.add_argument("--metrics", metavar="PATH", help="write per-stage timings (.json or .prom)")
+    parser.add_argument("--profile", metavar="PATH", help="run under cProfile and dump stats to PATH")
+    args = parser.parse_args(argv)
+
+    if args.metrics:
+        instrumentation.enable()
+
+    if args.fresh and os.path.exists(args.out):
+        os.remove(args.out)
+
+    with instrumentation.profiled("rank", dump_path=args.profile) if args.profile else nullcontext():
+        ranked = rank_directory(
+            args.jd, args.resumes, args.out, workers=args.workers, chunk_size=args.chunk_size,
+            batch_size=args.batch_size, save_db=args.save_db, progress=not args.quiet
+        )
+    if args.metrics:
+        with open(args.metrics, "w", encoding="utf-8") as f:
+            f.write(instrumentation.to_prometheus() if args.metrics.endswith(".prom") else instrumentation.to_json())
+    if not args.quiet:
+        print(f"Ranked {ranked} resumes -> {args.out}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,23 +1,56 @@
+import io
+import os
+import re
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from xml.sax.saxutils import escape
+
 from reportlab.lib.pagesizes import A4
 from reportlab.lib import colors
 from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
 from reportlab.lib.styles import getSampleStyleSheet
 
-def generate_report(candidate_name, resume_file, jd_file, result, feedback, output_path):
-    doc = SimpleDocTemplate(output_path, pagesize=A4)
+from backend.instrumentation import timed, size_of
+from backend.process_pool import get_process_pool, discard_process_pool
+
+# Built once per process and shared by every report
+_STYLES = None
+SCORE_TABLE_STYLE = TableStyle([
+    ("BACKGROUND", (0, 0), (-1, 0), colors.lightblue),
+    ("GRID", (0, 0), (-1, -1), 0.5, colors.grey),
+    ("FONTNAME", (0, 0), (-1, -1), "Helvetica")
+])
+
+# Reports for UI actions are built here so the Streamlit script never waits on them
+_background = ThreadPoolExecutor(max_workers=2, thread_name_prefix="reports")
+
+
+def _styles():
+    global _STYLES
+    if _STYLES is None:
+        _STYLES = getSampleStyleSheet()
+    return _STYLES
+
+
+@timed("report_generator.render_report")
+def render_report(candidate_name, resume_file, jd_file, result, feedback) -> bytes:
+    """Build one candidate report and return the PDF as bytes (nothing is written to disk)."""
+    buffer = io.BytesIO()
+    doc = SimpleDocTemplate(buffer, pagesize=A4)
     elements = []
 
-    styles = getSampleStyleSheet()
+    styles = _styles()
     title_style = styles["Title"]
     normal_style = styles["Normal"]
     heading_style = styles["Heading2"]
 
     # Title
-    elements.append(Paragraph(f"Resume Evaluation Report", title_style))
+    elements.append(Paragraph("Resume Evaluation Report", title_style))
     elements.append(Spacer(1, 12))
-    elements.append(Paragraph(f"Candidate: {candidate_name}", normal_style))
-    elements.append(Paragraph(f"Resume File: {resume_file}", normal_style))
-    elements.append(Paragraph(f"Job Description File: {jd_file}", normal_style))
+    elements.append(Paragraph(f"Candidate: {escape(str(candidate_name))}", normal_style))
+    elements.append(Paragraph(f"Resume File: {escape(str(resume_file))}", normal_style))
+    elements.append(Paragraph(f"Job Description File: {escape(str(jd_file))}", normal_style))
     elements.append(Spacer(1, 12))
 
     # Scores
@@ -29,27 +62,82 @@ def generate_report(candidate_name, resume_file, jd_file, result, feedback, outp
         ["Verdict", result["verdict"]]
     ]
     table = Table(score_data, colWidths=[150, 250])
-    table.setStyle(TableStyle([
-        ("BACKGROUND", (0, 0), (-1, 0), colors.lightblue),
-        ("GRID", (0, 0), (-1, -1), 0.5, colors.grey),
-        ("FONTNAME", (0, 0), (-1, -1), "Helvetica")
-    ]))
+    table.setStyle(SCORE_TABLE_STYLE)
     elements.append(table)
     elements.append(Spacer(1, 12))
 
     # Skills
     elements.append(Paragraph("✅ Matched Skills", heading_style))
-    elements.append(Paragraph(", ".join(result["resume_skills"]) or "None", normal_style))
+    elements.append(Paragraph(escape(", ".join(result["resume_skills"])) or "None", normal_style))
     elements.append(Spacer(1, 12))
 
     elements.append(Paragraph("❌ Missing Skills", heading_style))
-    elements.append(Paragraph(", ".join(result["missing_must"] + result["missing_good"]) or "None", normal_style))
+    elements.append(Paragraph(escape(", ".join(result["missing_must"] + result["missing_good"])) or "None", normal_style))
     elements.append(Spacer(1, 12))
 
     # Feedback
     elements.append(Paragraph("💡 Suggestions for Improvement", heading_style))
-    elements.append(Paragraph(feedback.replace("\n", "<br/>"), normal_style))
+    elements.append(Paragraph(escape(feedback).replace("\n", "<br/>"), normal_style))
 
-    # Save PDF
     doc.build(elements)
+    return buffer.getvalue()
+
+
+def generate_report(candidate_name, resume_file, jd_file, result, feedback, output_path):
+    """Build one candidate report and write it to output_path."""
+    with open(output_path, "wb") as f:
+        f.write(render_report(candidate_name, resume_file, jd_file, result, feedback))
     return output_path
+
+
+def _render_item(item: dict) -> bytes:
+    return render_report(item["candidate_name"], item["resume_file"], item["jd_file"], item["result"], item["feedback"])
+
+
+def _report_file_name(index: int, candidate_name: str) -> str:
+    safe = re.sub(r"[^A-Za-z0-9_-]+", "_", str(candidate_name)).strip("_") or "candidate"
+    return f"{index:03d}_{safe}_report.pdf"
+
+
+@timed("report_generator.generate_reports_bulk", size=size_of(0, "items"))
+def generate_reports_bulk(items: list, fmt: str = "zip", max_workers: int = None) -> bytes:
+    """
+    Render reports for a whole ranking run in parallel worker processes
+    (the shared spawned pool from process_pool.py, started on first use).
+    :param items: dicts with candidate_name, resume_file, jd_file, result, feedback (in packet order)
+    :param fmt: "zip" (one PDF per candidate) or "pdf" (one combined PDF)
+    :return: the ZIP or combined PDF as bytes
+    """
+    if fmt not in ("zip", "pdf"):
+        raise ValueError(f"Unknown report format: {fmt}")
+    items = list(items)
+    workers = max_workers or os.cpu_count() or 1
+    if workers == 1 or len(items) < 4:
+        pdfs = [_render_item(item) for item in items]
+    else:
+        pool = get_process_pool(workers)
+        try:
+            pdfs = list(pool.map(_render_item, items, chunksize=max(1, len(items) // (workers * 4))))
+        except BrokenProcessPool:
+            discard_process_pool(pool)
+            raise
+
+    if fmt == "zip":
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as zf:
+            for i, (item, pdf) in enumerate(zip(items, pdfs), start=1):
+                zf.writestr(_report_file_name(i, item["candidate_name"]), pdf)
+        return buffer.getvalue()
+
+    import fitz  # PyMuPDF, only needed to merge
+
+    with fitz.open() as combined:
+        for pdf in pdfs:
+            with fitz.open(stream=pdf, filetype="pdf") as part:
+                combined.insert_pdf(part)
+        return combined.tobytes()
+
+
+def generate_reports_async(items: list, fmt: str = "zip", max_workers: int = None):
+    """Start generate_reports_bulk in the background; returns a concurrent.futures.Future."""
+    return _background.submit(generate_reports_bulk, list(items), fmt, max_workers)
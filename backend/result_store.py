@@ -0,0 +1,155 @@
+# result_store.py
+import csv
+import io
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+
+from backend.instrumentation import timed
+
+# Columns of every ranking export: the Bulk Ranking downloads (CSV/Excel), the
+# CSV written by rank.py and, without "File", the Bulk Ranking table
+EXPORT_COLUMNS = [
+    "Candidate", "File", "Final Score", "Verdict", "Hard Score", "Soft Score", "Matched Skills", "Missing Skills"
+]
+
+
+class ResultStore:
+    """
+    Ranking results spilled to a temporary SQLite file instead of a Python
+    list, so a run of any size keeps only the chunk being written in memory.
+    Rows are read back best-first in pages (for display) or in chunks (for
+    exports). Safe to write from a worker thread while the UI thread reads.
+    """
+
+    def __init__(self, directory: str = None):
+        fd, self.path = tempfile.mkstemp(prefix="hiresight-ranking-", suffix=".db", dir=directory)
+        os.close(fd)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=OFF")  # scratch data, rebuilt if lost
+        self._conn.execute('''
+        CREATE TABLE results (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            candidate_name TEXT,
+            file_name TEXT,
+            final_score REAL,
+            result TEXT
+        )
+        ''')
+        self._conn.execute("CREATE INDEX idx_results_score ON results(final_score DESC, id)")
+        self._closed = False
+
+    def add(self, rows: list):
+        """:param rows: dicts with candidate_name, file_name and result (final_score output)"""
+        with self._lock:
+            if self._closed or not rows:
+                return
+            self._conn.executemany(
+                "INSERT INTO results (candidate_name, file_name, final_score, result) VALUES (?, ?, ?, ?)",
+                [(r["candidate_name"], r["file_name"], r["result"]["final_score"], json.dumps(r["result"]))
+                 for r in rows]
+            )
+            self._conn.commit()
+
+    def __len__(self) -> int:
+        with self._lock:
+            if self._closed:
+                return 0
+            return self._conn.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+
+    def top(self, limit: int = 100, offset: int = 0) -> list:
+        """One page of rows, best first, as {"candidate_name", "file_name", "result"}."""
+        with self._lock:
+            if self._closed:
+                return []
+            rows = self._conn.execute(
+                "SELECT candidate_name, file_name, result FROM results ORDER BY final_score DESC, id LIMIT ? OFFSET ?",
+                (int(limit), int(offset))
+            ).fetchall()
+        return [{"candidate_name": n, "file_name": f, "result": json.loads(r)} for n, f, r in rows]
+
+    def iter_rows(self, chunk_size: int = 500):
+        """Every row, best first, fetched `chunk_size` at a time (keyset paging, no OFFSET scans)."""
+        last = None
+        while True:
+            with self._lock:
+                if self._closed:
+                    return
+                if last is None:
+                    rows = self._conn.execute(
+                        "SELECT id, candidate_name, file_name, final_score, result FROM results "
+                        "ORDER BY final_score DESC, id LIMIT ?", (chunk_size,)
+                    ).fetchall()
+                else:
+                    rows = self._conn.execute(
+                        "SELECT id, candidate_name, file_name, final_score, result FROM results "
+                        "WHERE final_score < ? OR (final_score = ? AND id > ?) "
+                        "ORDER BY final_score DESC, id LIMIT ?", (last[1], last[1], last[0], chunk_size)
+                    ).fetchall()
+            if not rows:
+                return
+            for _, name, file_name, _, result in rows:
+                yield {"candidate_name": name, "file_name": file_name, "result": json.loads(result)}
+            last = (rows[-1][0], rows[-1][3])
+
+    def close(self):
+        """Drop the spill file. Later writes are ignored."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._conn.close()
+        for suffix in ("", "-wal", "-shm"):
+            try:
+                os.remove(self.path + suffix)
+            except FileNotFoundError:
+                pass
+
+
+def export_row(row: dict) -> list:
+    """One export line (EXPORT_COLUMNS order) for {"candidate_name", "file_name", "result"}."""
+    result = row["result"]
+    return [
+        row["candidate_name"], row["file_name"], result["final_score"], result["verdict"],
+        result["hard_score"], result["soft_score"], ", ".join(result["resume_skills"]),
+        ", ".join(result["missing_must"] + result["missing_good"]),
+    ]
+
+
+@timed("result_store.write_csv")
+def write_csv(rows, out, chunk_size: int = 500):
+    """
+    Write rows (e.g. ResultStore.iter_rows()) as CSV to a binary file object,
+    encoding and flushing one chunk at a time.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_COLUMNS)
+    for i, row in enumerate(rows, start=1):
+        writer.writerow(export_row(row))
+        if i % chunk_size == 0:
+            out.write(buffer.getvalue().encode("utf-8"))
+            buffer.seek(0)
+            buffer.truncate()
+    out.write(buffer.getvalue().encode("utf-8"))
+
+
+@timed("result_store.write_excel")
+def write_excel(rows, out):
+    """
+    Write rows as an .xlsx workbook to a path or binary file object. Uses
+    openpyxl's write-only mode, which streams rows instead of keeping a
+    worksheet in memory.
+    """
+    from openpyxl import Workbook  # optional, only needed for Excel exports
+
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Ranking")
+    ws.append(EXPORT_COLUMNS)
+    for row in rows:
+        ws.append(export_row(row))
+    wb.save(out)
@@ -1,20 +1,30 @@
 # resume_parser.py
 import fitz  # PyMuPDF
 import docx2txt
+import io
+import os
 import re
+from concurrent.futures.process import BrokenProcessPool
+
+from backend.skill_matcher import get_skill_automaton
+from backend.instrumentation import timed, size_of
+from backend.process_pool import get_process_pool, discard_process_pool
 
 def extract_text_from_pdf(path: str) -> str:
     """Extract text from PDF using PyMuPDF."""
-    doc = fitz.open(path)
-    text_parts = []
-    for page in doc:
-        text_parts.append(page.get_text())
-    return "\n".join(text_parts)
+    with fitz.open(path) as doc:
+        return "\n".join(page.get_text() for page in doc)
+
+def extract_text_from_pdf_bytes(data: bytes) -> str:
+    """Extract text from in-memory PDF bytes (no temp file)."""
+    with fitz.open(stream=data, filetype="pdf") as doc:
+        return "\n".join(page.get_text() for page in doc)
 
 def extract_text_from_docx(path: str) -> str:
     """Extract text from DOCX using docx2txt."""
     return docx2txt.process(path) or ""
 
+@timed("resume_parser.extract_text")
 def extract_text(path: str) -> str:
     """Detect file type and extract text."""
     if path.lower().endswith(".pdf"):
@@ -28,71 +38,167 @@ def extract_text(path: str) -> str:
         except Exception:
             return ""
 
+@timed("resume_parser.extract_text_from_bytes", size=size_of(0, "data"))
+def extract_text_from_bytes(data: bytes, filename: str) -> str:
+    """Detect file type from `filename` and extract text from in-memory bytes."""
+    name = filename.lower()
+    if name.endswith(".pdf"):
+        return extract_text_from_pdf_bytes(data)
+    elif name.endswith((".docx", ".doc")):
+        return docx2txt.process(io.BytesIO(data)) or ""
+    else:
+        return data.decode("utf-8", errors="ignore")
+
+def _extract_document(document) -> dict:
+    """Worker for extract_texts_bulk: never raises, reports the error instead."""
+    filename, data = document
+    try:
+        return {"file": filename, "text": normalize_text(extract_text_from_bytes(data, filename)), "error": None}
+    except Exception as e:
+        return {"file": filename, "text": "", "error": f"{type(e).__name__}: {e}"}
+
+@timed("resume_parser.extract_texts_bulk", size=size_of(0, "documents"))
+def extract_texts_bulk(documents: list, max_workers: int = None, min_parallel: int = 4) -> list:
+    """
+    Extract and normalize text for many in-memory documents.
+    Larger batches go to a shared pool of spawned worker processes, so scripts
+    calling this need an `if __name__ == "__main__":` guard (see process_pool.py).
+    :param documents: list of (filename, bytes) pairs
+    :param max_workers: process pool size (defaults to the number of CPUs)
+    :param min_parallel: batches smaller than this are extracted in-process
+    :return: list of {"file", "text", "error"} dicts, in input order
+    """
+    documents = list(documents)
+    workers = max_workers or os.cpu_count() or 1
+    if workers <= 1 or len(documents) < min_parallel:
+        return [_extract_document(d) for d in documents]
+
+    pool = get_process_pool(workers)
+    chunksize = max(1, len(documents) // (workers * 4))
+    try:
+        return list(pool.map(_extract_document, documents, chunksize=chunksize))
+    except BrokenProcessPool:
+        # A worker died (e.g. killed for memory); the next call starts a fresh pool
+        discard_process_pool(pool)
+        raise
+
+@timed("resume_parser.normalize_text", size=size_of(0, "text"))
 def normalize_text(text: str) -> str:
     """Clean extra spaces and newlines."""
     text = re.sub(r'\r\n', '\n', text)
     text = re.sub(r'\n{2,}', '\n\n', text)
     return text.strip()
 
-import re
-
+@timed("resume_parser.extract_skills_from_resume", size=size_of(0, "resume_text"))
 def extract_skills_from_resume(resume_text: str) -> list:
     """
-    Extract common technical skills from resume text.
-    (Simple keyword-based approach; can be expanded later)
+    Extract technical skills from resume text.
+    Skills (and their aliases) come from backend/skills.txt and are matched
+    on whole words in a single pass by a compiled Aho-Corasick automaton.
     """
-    # Define a simple skill set (expandable)
-    skills = [
-        "Python", "Java", "C++", "SQL", "R", "Tableau", "Power BI",
-        "Machine Learning", "Deep Learning", "NLP", "React", "Node.js",
-        "Excel", "Git", "Docker", "Kubernetes", "Pandas", "NumPy",
-        "Matplotlib", "Scikit-learn", "TensorFlow", "PyTorch"
-    ]
-
-    found = []
-    text_lower = resume_text.lower()
-
-    for skill in skills:
-        if skill.lower() in text_lower:
-            found.append(skill)
-
-    return sorted(set(found))
-
-import re
-
+    return sorted(get_skill_automaton().find(resume_text))
+
+
+# Contact details, matched together in one scan (alternatives are tried in this order).
+# A profile path stops where a glued-on URL starts ("linkedin.com/in/x-https://github.com/x").
+CONTACT_RE = re.compile(r"""
+    (?P<email>[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,})
+  | (?P<linkedin>(?:https?://)?(?:www\.)?linkedin\.com/(?:(?!https?://)[A-Za-z0-9_\-/])+)
+  | (?P<github>(?:https?://)?(?:www\.)?github\.com/(?:(?!https?://)[A-Za-z0-9_\-/])+)
+  | (?P<url>https?://[^\s,;|]+|www\.[^\s,;|]+)
+  | (?P<phone>(?<![\d+])(?:\+\d{1,3}[-\s]?)?(?:\d{10}|\d{5}[-\s]\d{5}|\(?\d{3}\)?[-\s]\d{3}[-\s]\d{4})(?!\d))
+""", re.I | re.X)
+YEARS_RE = re.compile(r"(\d{1,2}(?:\.\d)?)\s*\+?\s*(?:years?|yrs?)\b(?:\s+of)?(?:\s+\w+)?\s+experience", re.I)
+EDUCATION_RE = re.compile(
+    r"\b(?:B\.?\s?Tech|M\.?\s?Tech|B\.E\.|M\.E\.|B\.?\s?Sc|M\.?\s?Sc|BCA|MCA|MBA|B\.?\s?Com|Ph\.?\s?D"
+    r"|(?:Bachelor|Master)(?:'s)?(?:[ \t]+(?:of|in)[ \t]+[A-Z][A-Za-z]+(?:[ \t]+[A-Z][A-Za-z]+)*)?|Diploma)(?![A-Za-z])"
+)
+LOCATION_RE = re.compile(r"^\s*(?:location|address|based in)\s*[:\-]\s*(.+?)\s*$", re.I | re.M)
+CITY_RE = re.compile(r"\b([A-Z][a-z]+(?: [A-Z][a-z]+)?, ?[A-Z][a-z]+(?: [A-Z][a-z]+)?)\b")
+NAME_LINE_RE = re.compile(r"^[A-Za-z][A-Za-z.'\- ]{1,60}$")
+NOT_A_NAME = re.compile(r"\b(?:resume|curriculum|vitae|summary|objective|profile|contact)\b", re.I)
+
+# Contact details nearly always sit in the first lines; only fields not found
+# there are searched for in the rest of the document
+HEADER_LINES = 12
+HEADER_CHARS = 1500
+
+
+def _header_split(text: str) -> int:
+    """Offset where the header region (first HEADER_LINES lines, at most HEADER_CHARS) ends."""
+    end = 0
+    for _ in range(HEADER_LINES):
+        nl = text.find("\n", end, HEADER_CHARS)
+        if nl == -1:
+            return min(len(text), HEADER_CHARS)
+        end = nl + 1
+    return end
+
+
+def _scan_contacts(text: str, info: dict, links: list):
+    for m in CONTACT_RE.finditer(text):
+        kind = m.lastgroup
+        value = m.group(0)
+        if kind in ("linkedin", "github", "url"):
+            if value not in links:
+                links.append(value)
+            if kind == "url":
+                continue
+        if info[kind] is None:
+            info[kind] = value
+
+
+@timed("resume_parser.extract_candidate_info", size=size_of(0, "resume_text"))
 def extract_candidate_info(resume_text: str):
     """
-    Extracts candidate's name, email, phone, LinkedIn, GitHub from resume text.
+    Extracts candidate's name, email, phone, LinkedIn, GitHub, location,
+    years of experience, education and links from resume text.
+    Contact fields come from one scan of the header region, and of the rest
+    of the text only if some are still missing; years of experience and
+    education are separate searches over the whole text.
     Returns a dict with available details.
     """
-    info = {"name": None, "email": None, "phone": None, "linkedin": None, "github": None}
-
-    # Email
-    email_match = re.search(r"[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}", resume_text)
-    if email_match:
-        info["email"] = email_match.group(0)
-
-    # Phone (simple Indian/global pattern)
-    phone_match = re.search(r"(\+?\d{1,3}[-\s]?)?\d{10}", resume_text)
-    if phone_match:
-        info["phone"] = phone_match.group(0)
-
-    # LinkedIn
-    linkedin_match = re.search(r"(https?://)?(www\.)?linkedin\.com/[A-Za-z0-9_\-/]+", resume_text, re.I)
-    if linkedin_match:
-        info["linkedin"] = linkedin_match.group(0)
-
-    # GitHub
-    github_match = re.search(r"(https?://)?(www\.)?github\.com/[A-Za-z0-9_\-/]+", resume_text, re.I)
-    if github_match:
-        info["github"] = github_match.group(0)
-
-    # Name (first line of resume, before email/phone usually)
-    lines = resume_text.split("\n")
-    for line in lines:
-        line = line.strip()
-        if line and info["email"] and info["email"] not in line:
+    info = {"name": None, "email": None, "phone": None, "linkedin": None, "github": None,
+            "location": None, "years_experience": None, "education": [], "links": []}
+
+    split = _header_split(resume_text)
+    header, body = resume_text[:split], resume_text[split:]
+
+    _scan_contacts(header, info, info["links"])
+    if body and None in (info["email"], info["phone"], info["linkedin"], info["github"]):
+        _scan_contacts(body, info, info["links"])
+
+    # Name: first header line that looks like one, else the first line without the email
+    header_lines = [line.strip() for line in header.split("\n") if line.strip()]
+    for line in header_lines:
+        if NAME_LINE_RE.match(line) and len(line.split()) <= 5 and not NOT_A_NAME.search(line):
             info["name"] = line
             break
+    if info["name"] is None and info["email"]:
+        info["name"] = next((line for line in header_lines if info["email"] not in line), None)
 
+    # Location: explicit "Location:" line, else a "City, State" on the line with the email or phone
+    loc = LOCATION_RE.search(header)
+    if loc:
+        info["location"] = loc.group(1)
+    else:
+        contact_lines = [line for line in header_lines
+                         if any(value and value in line for value in (info["email"], info["phone"]))]
+        skills = get_skill_automaton()
+        info["location"] = next(
+            (m.group(1) for line in contact_lines for m in CITY_RE.finditer(line) if not skills.find(m.group(1))),
+            None
+        )
+
+    years = YEARS_RE.search(resume_text)
+    if years:
+        value = float(years.group(1))
+        info["years_experience"] = int(value) if value.is_integer() else value
+
+    info["education"] = list(dict.fromkeys(m.group(0) for m in EDUCATION_RE.finditer(resume_text)))
     return info
+
+
+def extract_candidate_info_bulk(resume_texts: list) -> list:
+    """extract_candidate_info for many resumes (patterns are compiled once at import)."""
+    return [extract_candidate_info(text) for text in resume_texts]
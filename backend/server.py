@@ -0,0 +1,338 @@
+# server.py
+"""
+Local HTTP scoring API.
+
+    python -m backend.server --port 8765
+
+Endpoints (JSON in, JSON out):
+
+    GET  /health       model and scoring config
+    GET  /metrics      per-endpoint latency (JSON; ?format=prometheus for text)
+    POST /extract      {"file_name", "content_base64"} -> text, skills, candidate_info
+    POST /similarity   {"resume_text", "jd_text"} -> soft_score
+    POST /score        resume + JD -> final_score result and feedback
+    POST /rank         JD + {"resumes": [...], "top_k"} -> results, best first
+
+A resume or JD is given either as text ("resume_text" / "jd_text") or as a
+file ("resume" / "jd": {"file_name", "content_base64"}). In /rank each item of
+"resumes" is {"id", "text"} or {"id", "file_name", "content_base64"}.
+
+Every request runs on its own thread. The model is loaded once, at startup.
+Embedding requests from all threads go through one EncodeBatcher, which
+waits a few milliseconds for concurrent requests and encodes them in a
+single batch. Under load, many requests share each forward pass instead of
+queueing for the model one by one.
+"""
+import argparse
+import base64
+import binascii
+import json
+import queue
+import sys
+import threading
+import time
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+
+import numpy as np
+
+from backend import instrumentation
+from backend.jd_parser import parse_jd
+from backend.matcher import (
+    CHUNK_CONFIG, encode_texts, hard_match, generate_feedback, semantic_similarity_batch, warm_up,
+    embedding_model_id, scoring_config_version, _combine_scores
+)
+from backend.pipeline import load_resumes
+from backend.resume_parser import (
+    extract_text_from_bytes, normalize_text, extract_skills_from_resume, extract_candidate_info
+)
+
+MAX_BODY_BYTES = 50 * 1024 * 1024
+
+
+class EncodeBatcher:
+    """
+    Collects encode requests from many threads and runs them as one
+    encode_texts call: after the first request arrives it waits up to
+    `max_wait_ms` for more, or until `max_batch` texts are pending.
+    """
+
+    def __init__(self, max_wait_ms: float = 5.0, max_batch: int = 64):
+        self.max_wait = max_wait_ms / 1000
+        self.max_batch = max_batch
+        self.batches = 0
+        self.requests = 0
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="encode-batcher", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._queue.put(None)
+        self._thread.join()
+
+    def encode(self, texts: list) -> np.ndarray:
+        """Unit-normalized embeddings for `texts` (blocks until their batch is done)."""
+        future = Future()
+        self._queue.put((list(texts), future))
+        return future.result()
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            item = self._queue.get()
+            if item is None:
+                return
+            pending, size = [item], len(item[0])
+            deadline = time.perf_counter() + self.max_wait
+            while size < self.max_batch:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                pending.append(item)
+                size += len(item[0])
+            self._encode(pending)
+
+    def _encode(self, pending: list):
+        texts = [text for texts, _ in pending for text in texts]
+        start = time.perf_counter()
+        try:
+            embs = encode_texts(texts, batch_size=self.max_batch) if texts else np.empty((0, 0), np.float32)
+        except Exception as e:
+            for _, future in pending:
+                future.set_exception(e)
+            return
+        instrumentation.record("server.encode_batch", time.perf_counter() - start, len(texts))
+        self.batches += 1
+        self.requests += len(pending)
+        offset = 0
+        for request_texts, future in pending:
+            future.set_result(embs[offset:offset + len(request_texts)])
+            offset += len(request_texts)
+
+
+class BadRequest(ValueError):
+    pass
+
+
+def _decode_file(spec: dict) -> tuple:
+    if not isinstance(spec, dict):
+        raise BadRequest("file must be an object with file_name and content_base64")
+    try:
+        return spec["file_name"], base64.b64decode(spec["content_base64"], validate=True)
+    except KeyError as e:
+        raise BadRequest(f"file needs file_name and content_base64 (missing {e})")
+    except (binascii.Error, TypeError, ValueError):
+        raise BadRequest("content_base64 is not valid base64")
+
+
+def _document_text(body: dict, key: str) -> str:
+    """Text of the resume/JD given as `<key>_text` or as a `<key>` file."""
+    if f"{key}_text" in body:
+        return str(body[f"{key}_text"])
+    if key in body:
+        file_name, data = _decode_file(body[key])
+        return normalize_text(extract_text_from_bytes(data, file_name))
+    raise BadRequest(f"missing {key}_text or {key}")
+
+
+class ScoringService:
+    """The endpoint implementations, independent of HTTP."""
+
+    def __init__(self, batcher: EncodeBatcher):
+        self.batcher = batcher
+
+    def soft_scores(self, resume_texts: list, jd_text: str) -> list:
+        # Chunked modes pool many embeddings per document; they keep the matcher's own path
+        if CHUNK_CONFIG["pooling"] != "none":
+            return semantic_similarity_batch(resume_texts, jd_text)
+        embs = self.batcher.encode([jd_text] + list(resume_texts))
+        return [round(float(np.dot(emb, embs[0])) * 100, 2) for emb in embs[1:]]
+
+    def health(self, body=None) -> dict:
+        return {"status": "ok", "model": embedding_model_id(), "config_version": scoring_config_version()}
+
+    def extract(self, body: dict) -> dict:
+        file_name, data = _decode_file(body)
+        doc = load_resumes([(file_name, data)])[0]
+        if doc["error"]:
+            raise BadRequest(f"could not read {file_name}: {doc['error']}")
+        return {"hash": doc["hash"], "text": doc["text"], "skills": doc["skills"],
+                "candidate_info": doc["candidate_info"]}
+
+    def similarity(self, body: dict) -> dict:
+        return {"soft_score": self.soft_scores([_document_text(body, "resume")], _document_text(body, "jd"))[0]}
+
+    def score(self, body: dict) -> dict:
+        resume_text, jd_text = _document_text(body, "resume"), _document_text(body, "jd")
+        jd_parsed = parse_jd(jd_text)
+        soft = self.soft_scores([resume_text], jd_text)[0]
+        result = _combine_scores(extract_skills_from_resume(resume_text), hard_match(resume_text, jd_parsed), soft)
+        return {"result": result, "feedback": generate_feedback(jd_parsed, result),
+                "candidate_info": extract_candidate_info(resume_text)}
+
+    def rank(self, body: dict) -> dict:
+        items = body.get("resumes")
+        if not isinstance(items, list) or not items or not all(isinstance(item, dict) for item in items):
+            raise BadRequest("resumes must be a non-empty list of objects")
+        top_k = body.get("top_k")
+        if top_k is not None and (isinstance(top_k, bool) or not isinstance(top_k, int) or top_k < 1):
+            raise BadRequest("top_k must be a positive integer")
+        jd_text = _document_text(body, "jd")
+
+        # Files are extracted together (process pool), texts are used as given
+        files = [(i, _decode_file(item)) for i, item in enumerate(items) if "text" not in item]
+        docs = dict(zip((i for i, _ in files), load_resumes([f for _, f in files]))) if files else {}
+        entries, errors = [], []
+        for i, item in enumerate(items):
+            item_id = item.get("id", i)
+            if i in docs:
+                if docs[i]["error"]:
+                    errors.append({"id": item_id, "error": docs[i]["error"]})
+                    continue
+                text, skills, info = docs[i]["text"], docs[i]["skills"], docs[i]["candidate_info"]
+            else:
+                text = str(item["text"])
+                skills, info = extract_skills_from_resume(text), extract_candidate_info(text)
+            entries.append((item_id, text, skills, info))
+
+        jd_parsed = parse_jd(jd_text)
+        soft = self.soft_scores([text for _, text, _, _ in entries], jd_text) if entries else []
+        ranked = sorted(
+            (
+                {"id": item_id, "candidate_info": info,
+                 "result": _combine_scores(skills, hard_match(text, jd_parsed), s)}
+                for (item_id, text, skills, info), s in zip(entries, soft)
+            ),
+            key=lambda r: r["result"]["final_score"], reverse=True
+        )
+        return {"results": ranked[:top_k] if top_k else ranked, "errors": errors}
+
+
+def make_handler(service: ScoringService):
+    routes = {
+        ("GET", "/health"): service.health,
+        ("POST", "/extract"): service.extract,
+        ("POST", "/similarity"): service.similarity,
+        ("POST", "/score"): service.score,
+        ("POST", "/rank"): service.rank,
+    }
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        quiet = False
+
+        def do_GET(self):
+            self._dispatch("GET")
+
+        def do_POST(self):
+            self._dispatch("POST")
+
+        def _dispatch(self, method: str):
+            url = urlsplit(self.path)
+            if method == "GET" and url.path == "/metrics":
+                return self._metrics(parse_qs(url.query))
+            route = routes.get((method, url.path))
+            if route is None:
+                return self._send(404, {"error": f"no route for {method} {url.path}"})
+
+            start = time.perf_counter()
+            try:
+                body = self._read_json() if method == "POST" else None
+                status, payload = 200, route(body)
+            except BadRequest as e:
+                status, payload = 400, {"error": str(e)}
+            except Exception as e:
+                status, payload = 500, {"error": f"{type(e).__name__}: {e}"}
+            self._send(status, payload)
+            instrumentation.record(f"server.{method} {url.path}", time.perf_counter() - start)
+
+        def _read_json(self) -> dict:
+            try:
+                length = int(self.headers.get("Content-Length") or 0)
+            except ValueError:
+                length = -1
+            if length < 0:
+                raise BadRequest("Content-Length must be a non-negative integer")
+            if length > MAX_BODY_BYTES:
+                raise BadRequest("request body too large")
+            try:
+                body = json.loads(self.rfile.read(length) or b"{}")
+            except json.JSONDecodeError as e:
+                raise BadRequest(f"invalid JSON: {e}")
+            if not isinstance(body, dict):
+                raise BadRequest("request body must be a JSON object")
+            return body
+
+        def _metrics(self, query: dict):
+            if query.get("format") == ["prometheus"]:
+                data = instrumentation.to_prometheus().encode("utf-8")
+                return self._send_bytes(200, data, "text/plain; version=0.0.4")
+            snapshot = instrumentation.snapshot()
+            snapshot["batcher"] = {"batches": service.batcher.batches, "requests": service.batcher.requests}
+            self._send(200, snapshot)
+
+        def _send(self, status: int, payload: dict):
+            self._send_bytes(status, json.dumps(payload).encode("utf-8"), "application/json")
+
+        def _send_bytes(self, status: int, data: bytes, content_type: str):
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, format, *args):
+            if not self.quiet:
+                super().log_message(format, *args)
+
+    return Handler
+
+
+def make_server(host: str = "127.0.0.1", port: int = 8765, max_wait_ms: float = 5.0, max_batch: int = 64,
+                quiet: bool = False) -> ThreadingHTTPServer:
+    """Build the server (not yet serving); server.batcher is already running."""
+    batcher = EncodeBatcher(max_wait_ms=max_wait_ms, max_batch=max_batch).start()
+    handler = make_handler(ScoringService(batcher))
+    handler.quiet = quiet
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    server.batcher = batcher
+    return server
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve resume/JD scoring over HTTP.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--max-wait-ms", type=float, default=5.0, help="how long a batch waits for more requests")
+    parser.add_argument("--max-batch", type=int, default=64, help="most texts encoded together")
+    parser.add_argument("--no-warm-up", action="store_true", help="load the model on the first request instead")
+    parser.add_argument("--quiet", action="store_true", help="no access log")
+    args = parser.parse_args(argv)
+
+    if not args.no_warm_up:
+        warm_up()
+    server = make_server(args.host, args.port, args.max_wait_ms, args.max_batch, quiet=args.quiet)
+    print(f"Serving on http://{args.host}:{args.port}", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        server.batcher.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+# skill_matcher.py
+import os
+import re
+from collections import deque
+from functools import lru_cache
+
+SKILLS_PATH = os.path.join(os.path.dirname(__file__), "skills.txt")
+
+# Words: letters/digits plus the symbols that are part of skill names (C++, C#, Node.js, .NET)
+TOKEN_RE = re.compile(r"\.?[A-Za-z0-9][A-Za-z0-9+#.]*")
+
+# Skills this short are matched case-sensitively ("R", "Go", "C"), so "r" or "go" in prose don't count
+CASE_SENSITIVE_MAX_LEN = 2
+
+# One-letter skills ("R") also occur as initials and inside abbreviations:
+# "R&D", "A/B/R", "Mr. R Sharma", "R. Kumar". Such occurrences don't count
+# ("Python/R" and "Languages: R" still do).
+JOINED_BEFORE_RE = re.compile(r"(?:[^A-Za-z0-9][A-Za-z]/|[&'\-])$")
+JOINED_AFTER_RE = re.compile(r"[&'\-]|/[A-Za-z](?![A-Za-z0-9])")
+INITIAL_RE = re.compile(r"\.?[ \t]+[A-Z][a-z]+")
+
+
+def tokenize(text: str) -> list:
+    """Split text into skill tokens, dropping sentence-final dots ("Python." -> "Python")."""
+    return [m.group(0).rstrip(".") for m in TOKEN_RE.finditer(text)]
+
+
+def _standalone_letter(text: str, start: int) -> bool:
+    """Whether the one-letter token at `start` is a word of its own, not part of an abbreviation or name."""
+    end = start + 1
+    if JOINED_BEFORE_RE.search(text[max(0, start - 3):start].rjust(3)):
+        return False
+    if JOINED_AFTER_RE.match(text[end:end + 3]):
+        return False
+    return not INITIAL_RE.match(text, end)
+
+
+def load_skill_dictionary(path: str = SKILLS_PATH) -> dict:
+    """
+    Read the skill taxonomy. One skill per line, optional aliases after "|":
+        Scikit-learn | sklearn | scikit learn
+    Blank lines and lines starting with "#" are ignored.
+    :return: {canonical skill: [canonical, alias, ...]}
+    """
+    skills = {}
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            names = [n.strip() for n in line.split("|") if n.strip()]
+            skills.setdefault(names[0], []).extend(names)
+    return skills
+
+
+class SkillAutomaton:
+    """
+    Aho-Corasick automaton over word tokens. Every skill/alias is compiled
+    once into the trie, and a resume is scanned in a single pass over its
+    tokens, so matching only happens on whole words ("Java" never matches
+    inside "JavaScript") and cost does not grow with the taxonomy size.
+    """
+
+    def __init__(self, skills: dict):
+        self.goto = [{}]
+        self.fail = [0]
+        self.out = [[]]
+
+        for canonical, names in skills.items():
+            for name in names:
+                tokens = tokenize(name)
+                if not tokens:
+                    continue
+                exact = tokens if len(name) <= CASE_SENSITIVE_MAX_LEN else None
+                self._add([t.lower() for t in tokens], (canonical, len(tokens), exact))
+        self._build_failure_links()
+
+    def _add(self, tokens: list, entry: tuple):
+        state = 0
+        for token in tokens:
+            nxt = self.goto[state].get(token)
+            if nxt is None:
+                nxt = len(self.goto)
+                self.goto[state][token] = nxt
+                self.goto.append({})
+                self.fail.append(0)
+                self.out.append([])
+            state = nxt
+        self.out[state].append(entry)
+
+    def _build_failure_links(self):
+        # Breadth-first: depth-1 states fail to the root, deeper ones to the
+        # longest proper suffix that is also a trie path
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for token, nxt in self.goto[state].items():
+                queue.append(nxt)
+                f = self.fail[state]
+                while f and token not in self.goto[f]:
+                    f = self.fail[f]
+                self.fail[nxt] = self.goto[f].get(token, 0)
+                self.out[nxt] = self.out[nxt] + self.out[self.fail[nxt]]
+
+    def find(self, text: str) -> set:
+        """Canonical names of every skill found in `text`."""
+        matches = list(TOKEN_RE.finditer(text))
+        tokens = [m.group(0).rstrip(".") for m in matches]
+        found = set()
+        state = 0
+        goto, fail, out = self.goto, self.fail, self.out
+        for i, token in enumerate(tokens):
+            lower = token.lower()
+            while state and lower not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(lower, 0)
+            for canonical, length, exact in out[state]:
+                if exact is None:
+                    found.add(canonical)
+                elif tokens[i - length + 1:i + 1] == exact:
+                    if len(token) > 1 or length > 1 or _standalone_letter(text, matches[i].start()):
+                        found.add(canonical)
+        return found
+
+
+@lru_cache(maxsize=4)
+def get_skill_automaton(path: str = SKILLS_PATH) -> SkillAutomaton:
+    """Compile the skill dictionary at `path` once per process."""
+    return SkillAutomaton(load_skill_dictionary(path))
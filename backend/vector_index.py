@@ -0,0 +1,163 @@
+# vector_index.py
+import os
+import threading
+import numpy as np
+
+from backend.db import list_document_hashes, get_documents
+from backend.matcher import encode_texts, embedding_model_id
+from backend.pipeline import load_stored, score_resumes
+
+INDEX_PATH = os.path.join(os.path.dirname(__file__), "..", "resume_index.npz")
+
+
+class VectorIndex:
+    """
+    Flat, file-backed index of unit-normalized embeddings, quantized to int8
+    with one float32 scale per vector (4x smaller than float32). Search is a
+    single int8 x float32 matrix-vector product over the whole pool, which
+    stays in the low milliseconds for tens of thousands of resumes.
+    Inserts and deletes happen in memory; save() writes the file atomically.
+    """
+
+    def __init__(self, path: str = INDEX_PATH, model_name: str = None):
+        self.path = path
+        self.model_name = model_name or embedding_model_id()
+        self.keys = []
+        self.codes = np.empty((0, 0), dtype=np.int8)
+        self.scales = np.empty((0,), dtype=np.float32)
+        self._positions = {}
+        self._dirty = False
+        if os.path.exists(path):
+            self._load()
+
+    def _load(self):
+        data = np.load(self.path, allow_pickle=False)
+        if str(data["model_name"]) != self.model_name:
+            return  # built with another model: start empty, it gets rebuilt
+        self.keys = [str(k) for k in data["keys"]]
+        self.codes = data["codes"]
+        self.scales = data["scales"]
+        self._positions = {k: i for i, k in enumerate(self.keys)}
+
+    def __len__(self):
+        return len(self.keys)
+
+    def __contains__(self, key):
+        return key in self._positions
+
+    def add(self, keys: list, embeddings):
+        """Insert (or replace) vectors for `keys`."""
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+        if not len(keys):
+            return
+        self.remove([k for k in keys if k in self._positions])
+
+        scales = np.abs(embeddings).max(axis=1) / 127.0
+        scales[scales == 0] = 1.0
+        codes = np.round(embeddings / scales[:, None]).astype(np.int8)
+
+        if not len(self.keys):
+            self.codes = codes
+            self.scales = scales.astype(np.float32)
+        else:
+            self.codes = np.vstack([self.codes, codes])
+            self.scales = np.concatenate([self.scales, scales.astype(np.float32)])
+        for k in keys:
+            self._positions[k] = len(self.keys)
+            self.keys.append(k)
+        self._dirty = True
+
+    def remove(self, keys: list):
+        """Delete vectors for `keys` (unknown keys are ignored)."""
+        drop = {self._positions[k] for k in keys if k in self._positions}
+        if not drop:
+            return
+        keep = np.array([i for i in range(len(self.keys)) if i not in drop], dtype=np.int64)
+        self.keys = [self.keys[i] for i in keep]
+        self.codes = self.codes[keep]
+        self.scales = self.scales[keep]
+        self._positions = {k: i for i, k in enumerate(self.keys)}
+        self._dirty = True
+
+    def search(self, query, k: int = 20) -> list:
+        """Approximate cosine top-k for a unit-normalized query: [(key, score 0-100), ...]."""
+        if not self.keys:
+            return []
+        query = np.asarray(query, dtype=np.float32)
+        scores = (self.codes @ query) * self.scales
+        k = min(k, len(self.keys))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(self.keys[i], round(float(scores[i]) * 100, 2)) for i in top]
+
+    def save(self):
+        """Write the index to disk (temp file + rename, so readers never see a partial file)."""
+        if not self._dirty:
+            return
+        tmp = self.path + ".tmp.npz"
+        np.savez(
+            tmp, keys=np.array(self.keys, dtype=str), codes=self.codes, scales=self.scales,
+            model_name=np.array(self.model_name)
+        )
+        os.replace(tmp, self.path)
+        self._dirty = False
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_pool_index() -> VectorIndex:
+    """The process-wide resume index, loaded from INDEX_PATH on first use."""
+    global _index
+    with _index_lock:
+        if _index is None or _index.path != INDEX_PATH or _index.model_name != embedding_model_id():
+            _index = VectorIndex(INDEX_PATH)
+        return _index
+
+
+def sync_pool_index(batch_size: int = 64) -> VectorIndex:
+    """
+    Bring the index in line with the resumes stored in results.db: embed and
+    insert new ones (through the embedding cache), drop deleted ones.
+    """
+    index = get_pool_index()
+    with _index_lock:
+        stored = set(list_document_hashes("resume"))
+        index.remove([k for k in index.keys if k not in stored])
+        missing = [h for h in stored if h not in index]
+        for i in range(0, len(missing), 512):
+            docs = get_documents(missing[i:i + 512])
+            keys = [h for h in missing[i:i + 512] if h in docs]
+            if keys:
+                index.add(keys, encode_texts([docs[h]["text"] for h in keys], batch_size=batch_size))
+        index.save()
+    return index
+
+
+def search_pool(jd_doc: dict, k: int = 20, rescore: bool = True) -> list:
+    """
+    Best candidates in the stored pool for a JD (as returned by pipeline.load_jd).
+    The index gives a top-k shortlist by embedding similarity; with rescore=True
+    only that shortlist goes through full scoring (score_resumes).
+    The index holds whole-document vectors, so the shortlist ignores
+    CHUNK_CONFIG pooling; rescoring applies it.
+    :return: list of {"hash", "file_name", "candidate_info", "similarity", "result"}
+             sorted best first; "result" is None when rescore=False
+    """
+    index = sync_pool_index()
+    hits = index.search(encode_texts([jd_doc["text"]])[0], k=k)
+    similarities = dict(hits)
+    shortlist = [(doc, similarities[doc["hash"]]) for doc in load_stored([h for h, _ in hits])]
+
+    results = score_resumes(jd_doc, [d for d, _ in shortlist]) if rescore and shortlist else [None] * len(shortlist)
+    matches = [
+        {
+            "hash": doc["hash"], "file_name": doc["file_name"], "candidate_info": doc["candidate_info"] or {},
+            "similarity": similarity, "result": result,
+        }
+        for (doc, similarity), result in zip(shortlist, results)
+    ]
+    if rescore:
+        matches.sort(key=lambda m: m["result"]["final_score"], reverse=True)
+    return matches
@@ -0,0 +1,217 @@
+# bench.py
+"""
+End-to-end throughput benchmark of the resume pipeline on a synthetic corpus.
+
+    python -m benchmarks.bench --resumes 200 --save-baseline v1
+    python -m benchmarks.bench --resumes 200 --compare v1
+
+Every stage is timed per document and reported as docs/sec, p50/p95
+latency and process peak RSS. Runs use a throw-away results.db and
+embedding cache in a temp directory, never the real ones.
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+import backend.db as db
+import backend.embedding_cache as embedding_cache
+import backend.matcher as matcher
+from backend.resume_parser import extract_text, normalize_text, extract_candidate_info, extract_skills_from_resume
+from backend.jd_parser import parse_jd
+from backend.report_generator import render_report
+from benchmarks.synthetic import generate_corpus
+
+BASELINE_DIR = os.path.join(os.path.dirname(__file__), "baselines")
+
+# A stage regresses when p50 latency or throughput is this much worse than the baseline
+DEFAULT_TOLERANCE = 0.20
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process so far, in MB (None where unsupported)."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KB, macOS bytes
+    return round(peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024, 1)
+
+
+def run_stage(report: dict, name: str, fn, items: list) -> list:
+    """Call fn(item) for every item, timing each call. Returns the outputs."""
+    outputs, latencies = [], []
+    start = time.perf_counter()
+    for item in items:
+        t = time.perf_counter()
+        outputs.append(fn(item))
+        latencies.append(time.perf_counter() - t)
+    record(report, name, latencies, len(items), time.perf_counter() - start)
+    return outputs
+
+
+def record(report: dict, name: str, latencies: list, docs: int, total: float):
+    lat_ms = np.array(latencies) * 1000 if latencies else np.zeros(1)
+    report["stages"][name] = {
+        "docs": docs,
+        "total_s": round(total, 4),
+        "docs_per_sec": round(docs / total, 2) if total else None,
+        "p50_ms": round(float(np.percentile(lat_ms, 50)), 3),
+        "p95_ms": round(float(np.percentile(lat_ms, 95)), 3),
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def run_benchmarks(resumes: int = 100, jds: int = 3, formats=("pdf", "docx", "txt"), words: int = 400,
+                   skill_density: float = 0.08, semantic: bool = True, seed: int = 42) -> dict:
+    """Generate a corpus, run every stage over it and return the report dict."""
+    report = {
+        "config": {"resumes": resumes, "jds": jds, "formats": list(formats), "words": words,
+                   "skill_density": skill_density, "seed": seed},
+        "stages": {},
+        "skipped": {},
+    }
+    with tempfile.TemporaryDirectory(prefix="hiresight-bench-") as tmp:
+        db.DB_PATH = os.path.join(tmp, "results.db")
+        embedding_cache.CACHE_PATH = os.path.join(tmp, "embeddings.db")
+
+        corpus = generate_corpus(os.path.join(tmp, "corpus"), resumes=resumes, jds=jds, formats=formats,
+                                 words=words, skill_density=skill_density, seed=seed)
+
+        for fmt in formats:
+            paths = [p for p in corpus["resumes"] if p.endswith("." + fmt)]
+            run_stage(report, f"extract_text[{fmt}]", extract_text, paths)
+        raw = run_stage(report, "extract_text", extract_text, corpus["resumes"])
+        texts = run_stage(report, "normalize_text", normalize_text, raw)
+        run_stage(report, "extract_candidate_info", extract_candidate_info, texts)
+        skills = run_stage(report, "extract_skills_from_resume", extract_skills_from_resume, texts)
+
+        jd_texts = [normalize_text(extract_text(p)) for p in corpus["jds"]]
+        jd_parsed = run_stage(report, "parse_jd", parse_jd, jd_texts)
+        run_stage(report, "hard_match", lambda t: matcher.hard_match(t, jd_parsed[0]), texts)
+
+        results = None
+        if semantic:
+            try:
+                matcher.warm_up()
+            except Exception as e:
+                report["skipped"]["semantic_similarity"] = f"model unavailable: {type(e).__name__}: {e}"
+            else:
+                # Measure the model, not the cache
+                matcher.USE_EMBEDDING_CACHE = False
+                try:
+                    run_stage(report, "semantic_similarity",
+                              lambda t: matcher.semantic_similarity(t, jd_texts[0]), texts)
+                    start = time.perf_counter()
+                    matcher.semantic_similarity_batch(texts, jd_texts[0])
+                    elapsed = time.perf_counter() - start
+                    record(report, "semantic_similarity_batch", [elapsed / max(1, len(texts))] * len(texts),
+                           len(texts), elapsed)
+                finally:
+                    matcher.USE_EMBEDDING_CACHE = True
+                results = matcher.final_score_batch(skills, jd_parsed[0], texts, jd_texts[0])
+        else:
+            report["skipped"]["semantic_similarity"] = "disabled (--no-semantic)"
+
+        if results is None:
+            # Hard-match-only results so DB and report stages still have realistic rows
+            results = [
+                matcher._combine_scores(s, matcher.hard_match(t, jd_parsed[0]), 0.0) for s, t in zip(skills, texts)
+            ]
+        feedback = [matcher.generate_feedback(jd_parsed[0], r) for r in results]
+        rows = [
+            {"candidate_name": f"Candidate {i}", "resume_file": os.path.basename(p), "jd_file": "jd_000.pdf",
+             "result": r, "feedback": f}
+            for i, (p, r, f) in enumerate(zip(corpus["resumes"], results, feedback))
+        ]
+
+        db.init_db()
+        run_stage(report, "db.save_evaluation", lambda row: db.save_evaluation(**row), rows)
+        start = time.perf_counter()
+        db.save_evaluations_bulk(rows)
+        elapsed = time.perf_counter() - start
+        record(report, "db.save_evaluations_bulk", [elapsed / max(1, len(rows))] * len(rows), len(rows), elapsed)
+
+        run_stage(report, "render_report", lambda row: render_report(**row), rows)
+        db.close_connection()
+
+    report["peak_rss_mb"] = peak_rss_mb()
+    return report
+
+
+def compare(report: dict, baseline: dict, tolerance: float = DEFAULT_TOLERANCE) -> list:
+    """Stages that got slower than the baseline by more than `tolerance`, as readable messages."""
+    regressions = []
+    for name, stats in report["stages"].items():
+        base = baseline.get("stages", {}).get(name)
+        if not base:
+            continue
+        if base["p50_ms"] and stats["p50_ms"] > base["p50_ms"] * (1 + tolerance):
+            regressions.append(f"{name}: p50 {base['p50_ms']}ms -> {stats['p50_ms']}ms")
+        if base["docs_per_sec"] and stats["docs_per_sec"] and \
+                stats["docs_per_sec"] < base["docs_per_sec"] / (1 + tolerance):
+            regressions.append(f"{name}: {base['docs_per_sec']} -> {stats['docs_per_sec']} docs/s")
+    return regressions
+
+
+def print_report(report: dict):
+    print(f"{'stage':<32}{'docs':>7}{'docs/s':>11}{'p50 ms':>10}{'p95 ms':>10}{'peak MB':>10}")
+    for name, s in report["stages"].items():
+        print(f"{name:<32}{s['docs']:>7}{s['docs_per_sec'] or 0:>11.1f}{s['p50_ms']:>10.2f}"
+              f"{s['p95_ms']:>10.2f}{s['peak_rss_mb'] or 0:>10.1f}")
+    for name, reason in report["skipped"].items():
+        print(f"{name:<32}skipped: {reason}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark every pipeline stage on a synthetic corpus.")
+    parser.add_argument("--resumes", type=int, default=100)
+    parser.add_argument("--jds", type=int, default=3)
+    parser.add_argument("--formats", default="pdf,docx,txt")
+    parser.add_argument("--words", type=int, default=400, help="approximate words per resume")
+    parser.add_argument("--skill-density", type=float, default=0.08)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--no-semantic", action="store_true", help="skip the transformer stages")
+    parser.add_argument("--json", help="also write the report to this file")
+    parser.add_argument("--save-baseline", metavar="NAME", help="store the report as benchmarks/baselines/NAME.json")
+    parser.add_argument("--compare", metavar="NAME", help="compare against a stored baseline (exit 1 on regression)")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    args = parser.parse_args(argv)
+
+    report = run_benchmarks(
+        resumes=args.resumes, jds=args.jds, formats=tuple(args.formats.split(",")), words=args.words,
+        skill_density=args.skill_density, semantic=not args.no_semantic, seed=args.seed
+    )
+    print_report(report)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    if args.save_baseline:
+        os.makedirs(BASELINE_DIR, exist_ok=True)
+        with open(os.path.join(BASELINE_DIR, f"{args.save_baseline}.json"), "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    if args.compare:
+        with open(os.path.join(BASELINE_DIR, f"{args.compare}.json"), encoding="utf-8") as f:
+            baseline = json.load(f)
+        if baseline.get("config") != report["config"]:
+            print("warning: baseline was recorded with a different corpus config", file=sys.stderr)
+        regressions = compare(report, baseline, args.tolerance)
+        if regressions:
+            print("\nRegressions:")
+            for r in regressions:
+                print("  " + r)
+            sys.exit(1)
+        print("\nNo regressions against baseline " + args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+# synthetic.py
+"""
+Synthetic resume / JD corpus generator for the benchmarks.
+
+    python -m benchmarks.synthetic --out /tmp/corpus --resumes 200 --jds 5 --formats pdf,docx,txt
+"""
+import argparse
+import os
+import random
+import zipfile
+from xml.sax.saxutils import escape
+
+from backend.skill_matcher import load_skill_dictionary
+
+FIRST_NAMES = ["Aarav", "Priya", "Rahul", "Sneha", "Vikram", "Ananya", "Karthik", "Divya", "Arjun", "Meera",
+               "John", "Maria", "Wei", "Fatima", "Lucas", "Aisha", "Noah", "Elena", "Omar", "Sara"]
+LAST_NAMES = ["Sharma", "Reddy", "Iyer", "Patel", "Kumar", "Singh", "Nair", "Gupta", "Smith", "Garcia",
+              "Chen", "Khan", "Silva", "Müller", "Rossi", "Okafor", "Tanaka", "Novak", "Haddad", "Kowalski"]
+FILLER = ("worked on delivered designed built improved analysed managed maintained automated collaborated "
+          "with team members stakeholders clients across projects pipelines dashboards reports services "
+          "data systems using tools to reduce cost increase accuracy and performance over several quarters").split()
+SECTIONS = ["Summary", "Experience", "Projects", "Education", "Certifications"]
+
+
+def _sentence(rng: random.Random, skills: list, skill_density: float, words: int = 14) -> str:
+    out = []
+    for _ in range(words):
+        out.append(rng.choice(skills) if rng.random() < skill_density else rng.choice(FILLER))
+    return " ".join(out).capitalize() + "."
+
+
+def make_resume(rng: random.Random, skills: list, words: int = 400, skill_density: float = 0.08) -> str:
+    """One synthetic resume as plain text (header + sections), roughly `words` words long."""
+    first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+    lines = [
+        f"{first} {last}",
+        f"{first.lower()}.{last.lower()}@example.com | +91 9{rng.randint(100000000, 999999999)}",
+        f"linkedin.com/in/{first.lower()}{last.lower()} | github.com/{first.lower()}{rng.randint(1, 99)}",
+        "",
+        "Technical Skills: " + ", ".join(rng.sample(skills, min(len(skills), rng.randint(4, 12)))),
+        "",
+    ]
+    per_section = max(1, words // (len(SECTIONS) * 14))
+    for section in SECTIONS:
+        lines.append(section)
+        lines.extend("- " + _sentence(rng, skills, skill_density) for _ in range(per_section))
+        lines.append("")
+    return "\n".join(lines)
+
+
+def make_jd(rng: random.Random, skills: list, requirements: int = 10) -> str:
+    """One synthetic job description as plain text."""
+    role = rng.choice(["Data Scientist", "Backend Engineer", "ML Engineer", "Data Analyst", "Full Stack Developer"])
+    picked = rng.sample(skills, min(len(skills), requirements))
+    lines = [role, "", "About the role", _sentence(rng, skills, 0.05, 25), "", "Requirements"]
+    lines += [f"● Must have hands-on experience with {s}" for s in picked[: requirements * 2 // 3]]
+    lines += ["", "Nice to have"]
+    lines += [f"● Good to have exposure to {s}" for s in picked[requirements * 2 // 3:]]
+    return "\n".join(lines)
+
+
+def write_pdf(text: str, path: str):
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.styles import getSampleStyleSheet
+    from reportlab.platypus import SimpleDocTemplate, Paragraph
+
+    style = getSampleStyleSheet()["Normal"]
+    SimpleDocTemplate(path, pagesize=A4).build(
+        [Paragraph(escape(line) or "&nbsp;", style) for line in text.split("\n")]
+    )
+
+
+def write_docx(text: str, path: str):
+    """Minimal WordprocessingML package (enough for docx2txt), without python-docx."""
+    body = "".join(
+        f'<w:p><w:r><w:t xml:space="preserve">{escape(line)}</w:t></w:r></w:p>' for line in text.split("\n")
+    )
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr("[Content_Types].xml", (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+            '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+            '<Default Extension="xml" ContentType="application/xml"/>'
+            '<Override PartName="/word/document.xml" '
+            'ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>'
+            '</Types>'
+        ))
+        zf.writestr("_rels/.rels", (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+            '<Relationship Id="rId1" '
+            'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+            'Target="word/document.xml"/></Relationships>'
+        ))
+        zf.writestr("word/document.xml", (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">'
+            f'<w:body>{body}</w:body></w:document>'
+        ))
+
+
+def write_txt(text: str, path: str):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+
+
+WRITERS = {"pdf": write_pdf, "docx": write_docx, "txt": write_txt}
+
+
+def generate_corpus(out_dir: str, resumes: int = 100, jds: int = 3, formats=("pdf", "docx", "txt"),
+                    words: int = 400, skill_density: float = 0.08, seed: int = 42) -> dict:
+    """
+    Write a synthetic corpus to out_dir/resumes and out_dir/job_descriptions.
+    Resume formats rotate through `formats`; JDs are always PDF.
+    :return: {"resumes": [paths], "jds": [paths]}
+    """
+    rng = random.Random(seed)
+    skills = [name for names in load_skill_dictionary().values() for name in names[:1]]
+    resume_dir = os.path.join(out_dir, "resumes")
+    jd_dir = os.path.join(out_dir, "job_descriptions")
+    os.makedirs(resume_dir, exist_ok=True)
+    os.makedirs(jd_dir, exist_ok=True)
+
+    corpus = {"resumes": [], "jds": []}
+    for i in range(resumes):
+        fmt = formats[i % len(formats)]
+        path = os.path.join(resume_dir, f"resume_{i:05d}.{fmt}")
+        WRITERS[fmt](make_resume(rng, skills, words=words, skill_density=skill_density), path)
+        corpus["resumes"].append(path)
+    for i in range(jds):
+        path = os.path.join(jd_dir, f"jd_{i:03d}.pdf")
+        write_pdf(make_jd(rng, skills), path)
+        corpus["jds"].append(path)
+    return corpus
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate a synthetic resume/JD corpus.")
+    parser.add_argument("--out", required=True, help="output directory")
+    parser.add_argument("--resumes", type=int, default=100)
+    parser.add_argument("--jds", type=int, default=3)
+    parser.add_argument("--formats", default="pdf,docx,txt", help="comma-separated: pdf,docx,txt")
+    parser.add_argument("--words", type=int, default=400, help="approximate words per resume")
+    parser.add_argument("--skill-density", type=float, default=0.08, help="share of words that are skills")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args(argv)
+
+    corpus = generate_corpus(
+        args.out, resumes=args.resumes, jds=args.jds, formats=tuple(args.formats.split(",")),
+        words=args.words, skill_density=args.skill_density, seed=args.seed
+    )
+    print(f"Wrote {len(corpus['resumes'])} resumes and {len(corpus['jds'])} JDs to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
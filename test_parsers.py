@@ -1,6 +1,8 @@
+import glob
+
 from backend.resume_parser import extract_text, normalize_text, extract_skills_from_resume
 from backend.jd_parser import parse_jd
-from backend.matcher import hard_match, semantic_similarity, final_score, generate_feedback
+from backend.matcher import hard_match, semantic_similarity, final_score, final_score_batch, generate_feedback
 from backend.db import init_db, save_evaluation, fetch_all
 
 # Paths to sample data
@@ -22,6 +24,22 @@ jd_parsed = parse_jd(jd_text, file_path=jd_path)
 print("\n=== Parsed JD ===")
 print(jd_parsed)
 
+# A requirement bullet that mentions a role must not end the section
+short_jd = parse_jd("Data Analyst\nRequirements:\n- Python and SQL\n- Prior experience as a data analyst\n- Tableau dashboards\n")
+assert short_jd["must_have"] == ["Python and SQL", "Prior experience as a data analyst", "Tableau dashboards"], short_jd
+# Without any headings the bullets themselves are the requirements
+plain_jd = parse_jd("Data Analyst\n- Python and SQL\n- Tableau dashboards\n")
+assert plain_jd["must_have"] == ["Python and SQL", "Tableau dashboards"], plain_jd
+# Bullets naming a role or starting with "About" stay in their section
+support_jd = parse_jd("Data Engineer\nResponsibilities:\n- Build pipelines\n- Support the Senior Data Engineer\n"
+                      "- Maintain Airflow DAGs\nRequirements:\n- Python\n")
+assert support_jd["responsibilities"] == ["Build pipelines", "Support the Senior Data Engineer",
+                                          "Maintain Airflow DAGs"], support_jd
+about_jd = parse_jd("Data Analyst\nRequirements:\n- Python\n- About Python and SQL\n- Tableau\n")
+assert about_jd["must_have"] == ["Python", "About Python and SQL", "Tableau"], about_jd
+about_line_jd = parse_jd("Data Analyst\nRequirements:\n- Strong Python.\nAbout two years of SQL\n- Tableau\n")
+assert about_line_jd["must_have"] == ["Strong Python.", "About two years of SQL", "Tableau"], about_line_jd
+
 # --- Extract Resume Skills ---
 resume_skills = extract_skills_from_resume(resume_text)
 print("\n=== Skills Detected in Resume ===")
@@ -37,6 +55,15 @@ feedback = generate_feedback(jd_parsed, final_result)
 print("\n=== Suggestions for Improvement ===")
 print(feedback)
 
+# --- Bulk Ranking (batched) ---
+bulk_paths = sorted(glob.glob("Sample_Data/resumes/*.pdf"))
+bulk_texts = [normalize_text(extract_text(p)) for p in bulk_paths]
+bulk_skills = [extract_skills_from_resume(t) for t in bulk_texts]
+bulk_results = final_score_batch(bulk_skills, jd_parsed, bulk_texts, jd_text)
+print("\n=== Bulk Ranking ===")
+for path, res in sorted(zip(bulk_paths, bulk_results), key=lambda x: x[1]["final_score"], reverse=True):
+    print(f"{res['final_score']:6.2f}  {res['verdict']:<6}  {path}")
+
 # --- Save to DB ---
 init_db()
 save_evaluation(